@@ -0,0 +1,175 @@
+'''Benchmark
+
+This file can be run to measure the speed of the players and of the trainings and the memory of the tables.
+Below you can specify the parameters of the benchmark.
+
+It will create the file './benchmark_data/benchmark_#.json' where '#' is a unique index to a benchmark.
+It will contain the parameters and the results of the benchmark. The results are:
+
+	'choice_latency_p50_ms/#' and 'choice_latency_p95_ms/#': the duration of 'choice' of the player '#'
+	in the games of all matchups (see 'record_latency' in 'tools.py').
+	'games_per_second/#-#': the number of games per second of 'play' in 'tools.py' for a matchup.
+	'games_per_second/Q training' and 'games_per_second/TD training': the speed of 'train_single_game'.
+	'updates_per_second/Deep training': the number of updates of the network per second in 'train_single_game'.
+	'table_memory_bytes/#' and 'peak_memory_bytes/# training': the memory size of the tables of the Q and TD
+	Player and the peak of the memory that is allocated while they are created and trained (with tracemalloc).
+
+	The results are compared to the baseline './benchmark_data/baseline.json' (see 'compare_benchmarks'
+	in 'tools.py'). A result that is worse than the baseline by more than the fraction 'threshold' is a
+	regression and the file exits with an error. If there is no baseline or if 'update_baseline' is True,
+	the benchmark becomes the new baseline.
+'''
+
+
+import os
+import sys
+import json
+import random
+import time
+import tracemalloc
+import torch
+
+from game import ConnectFour
+from players import RandomPlayer, PrunPlayer, ChainPlayer, QPlayer, TDPlayer, DeepPlayer
+from tools import play, percentiles, compare_benchmarks
+
+
+# Initialize game
+connectfour = ConnectFour()
+
+
+# Benchmark parameters
+games_per_matchup = 10
+number_of_games_q = 2000
+number_of_games_td = 1000
+number_of_games_deep = 20
+number_of_games_memory = 200
+capacity = 2**16
+threshold = 0.2
+update_baseline = False
+seed = 0
+
+random.seed(seed)
+torch.manual_seed(seed)
+
+
+# Make directory
+dir_path = './benchmark_data/'
+if not os.path.isdir(dir_path):
+	os.mkdir(dir_path)
+index = 1
+while os.path.isfile(dir_path + 'benchmark_' + str(index) + '.json'):
+	index += 1
+file_path = dir_path + 'benchmark_' + str(index) + '.json'
+baseline_path = dir_path + 'baseline.json'
+
+results = {}
+
+
+# Training of the Q and TD Player
+qplayer = QPlayer(0.3, 0.2, 0.9, capacity)
+tdplayer = TDPlayer(0.3, 0.2, 0.9, 0.8, capacity)
+for player, number_of_games in [(qplayer, number_of_games_q), (tdplayer, number_of_games_td)]:
+	time1 = time.time()
+	for i in range(number_of_games):
+		player.train_single_game(connectfour)
+	time2 = time.time()
+	results['games_per_second/' + player.name + ' training'] = number_of_games/(time2 - time1)
+results['table_memory_bytes/Q'] = qplayer.Q1.memory_size() + qplayer.Q2.memory_size()
+results['table_memory_bytes/TD'] = tdplayer.V.memory_size()
+
+for new_player in [lambda: QPlayer(0.3, 0.2, 0.9, capacity), lambda: TDPlayer(0.3, 0.2, 0.9, 0.8, capacity)]:
+	tracemalloc.start()
+	player = new_player()
+	for i in range(number_of_games_memory):
+		player.train_single_game(connectfour)
+	current, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	results['peak_memory_bytes/' + player.name + ' training'] = peak
+	del player
+
+
+# Training of the Deep Player
+deepplayer = DeepPlayer(0.15, 0.2, 0.9, 1, 40)
+number_of_updates = 0
+time1 = time.time()
+for i in range(number_of_games_deep):
+	number_of_updates += len(deepplayer.train_single_game(connectfour))
+time2 = time.time()
+results['updates_per_second/Deep training'] = number_of_updates/(time2 - time1)
+
+
+# Matchups
+for player in [qplayer, tdplayer, deepplayer]:
+	player.epsilon = 0
+random_player = RandomPlayer()
+prun2 = PrunPlayer(2)
+prun4 = PrunPlayer(4)
+matchups = [
+	(random_player, random_player),
+	(prun2, random_player),
+	(prun4, prun2),
+	(ChainPlayer('offensive'), ChainPlayer('defensive')),
+	(deepplayer, prun2),
+	(qplayer, tdplayer),
+]
+
+latencies = {}
+for player_x, player_o in matchups:
+	time1 = time.time()
+	for i in range(games_per_matchup):
+		play(connectfour, player_x, player_o, True, False, latencies)
+	time2 = time.time()
+	results['games_per_second/' + player_x.name + '-' + player_o.name] = games_per_matchup/(time2 - time1)
+
+for name, per_move in latencies.items():
+	durations = [duration for move_durations in per_move.values() for duration in move_durations]
+	stats = percentiles(durations)
+	results['choice_latency_p50_ms/' + name] = stats['p50']*1000
+	results['choice_latency_p95_ms/' + name] = stats['p95']*1000
+
+
+# Save benchmark
+benchmark = {
+	'game' : connectfour.name,
+	'parameters' : {
+		'games_per_matchup' : games_per_matchup,
+		'number_of_games_q' : number_of_games_q,
+		'number_of_games_td' : number_of_games_td,
+		'number_of_games_deep' : number_of_games_deep,
+		'number_of_games_memory' : number_of_games_memory,
+		'capacity' : capacity,
+		'seed' : seed,
+	},
+	'results' : results,
+}
+with open(file_path, 'w') as file:
+	json.dump(benchmark, file, indent=1)
+print('Benchmark saved in', file_path)
+print()
+
+
+# Compare with baseline
+if update_baseline or not os.path.isfile(baseline_path):
+	with open(baseline_path, 'w') as file:
+		json.dump(benchmark, file, indent=1)
+	for name, value in results.items():
+		print(name, '|', round(value, 3))
+	print()
+	print('Benchmark saved as baseline in', baseline_path)
+else:
+	with open(baseline_path) as file:
+		baseline = json.load(file)['results']
+	changes, regressions = compare_benchmarks(results, baseline, threshold)
+	for name, value in results.items():
+		line = name + ' | ' + str(round(value, 3))
+		if name in changes:
+			line += ' | baseline ' + str(round(baseline[name], 3)) + ' | ' + ('+' if changes[name] >= 0 else '') + str(round(100*changes[name], 1)) + '%'
+		if name in regressions:
+			line += ' | REGRESSION'
+		print(line)
+	print()
+	if regressions:
+		print(len(regressions), 'regressions of more than', str(round(100*threshold)) + '%', 'compared to', baseline_path)
+		sys.exit(1)
+	print('No regressions of more than', str(round(100*threshold)) + '%', 'compared to', baseline_path)
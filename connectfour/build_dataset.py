@@ -0,0 +1,85 @@
+'''Build dataset
+
+This file can be run to build a dataset of labelled positions for the training of a DeepPlayer.
+Below you can specify the parameters of the dataset.
+
+It will create a new directory './dataset_data/dataset_#' where '#' is a unique index to a dataset.
+It will contain the shards of the dataset and the file 'dataset_info.pickle' (see 'dataset.py').
+
+	The positions are reached by random actions from the empty board and every position is labelled
+	with the value of an Alpha-beta search of depth 'depth'. If 'node_budget' is not None, positions that
+	a proof-number search with this budget solves (see 'pnsearch.py') get their exact value instead. The positions are labelled in parallel
+	by 'number_of_processes' processes (the processes are forked, so this requires a Unix system).
+
+	In 'training.py' you can train a DeepPlayer on the dataset before it plays against itself.
+'''
+
+
+import os
+import random
+import multiprocessing
+import time
+
+from game import ConnectFour
+from dataset import labelled_positions, ShardWriter
+
+
+# Initialize game, it keeps the encoding of its position for the network up to date
+connectfour = ConnectFour(track_features=True)
+
+
+# Dataset parameters
+number_of_positions = 100000
+depth = 4
+node_budget = None
+max_random_actions = None
+shard_size = 50000
+positions_per_task = 1000
+number_of_processes = os.cpu_count()
+
+
+def label_task(number_of_positions):
+	random.seed()
+	return labelled_positions(connectfour, number_of_positions, depth, max_random_actions, node_budget)
+
+
+# Make new directory
+dir_path = './dataset_data/'
+if not os.path.isdir(dir_path):
+	os.mkdir(dir_path)
+dir_path += 'dataset_'
+index = 1
+while os.path.isdir(dir_path + str(index)):
+	index += 1
+dir_path += str(index)
+
+
+# Dataset info
+dataset_info = {
+	'game' : connectfour.name,
+	'depth' : depth,
+	'node_budget' : node_budget,
+	'max_random_actions' : max_random_actions,
+}
+
+
+# Label positions
+time1 = time.time()
+tasks = [positions_per_task]*(number_of_positions//positions_per_task)
+if number_of_positions % positions_per_task > 0:
+	tasks.append(number_of_positions % positions_per_task)
+
+writer = ShardWriter(dir_path, len(connectfour.features), shard_size, dataset_info)
+with multiprocessing.get_context('fork').Pool(number_of_processes) as pool:
+	for k, (states, values) in enumerate(pool.imap_unordered(label_task, tasks), 1):
+		writer.add(states, values)
+		print(k*positions_per_task if k < len(tasks) else number_of_positions, 'positions labelled')
+writer.close()
+time2 = time.time()
+
+
+# Print dataset info
+print()
+print('Dataset saved in', dir_path)
+print('Number of positions:', number_of_positions, ' | number of shards:', len(writer.shard_sizes))
+print('Duration:', round(time2 - time1, 0), 'seconds')
@@ -0,0 +1,50 @@
+'''Build tablebase
+
+This file can be run to build the complete tablebase of a small Connect Four board.
+Below you can specify the size of the board.
+
+It will create the file './tablebase_data/tablebase_#x#.npy' where '#x#' is the number of rows and columns.
+
+	The tablebase contains the value of every position that can be reached from the empty board
+	(see 'tablebase.py'). It can be opened with 'Tablebase(file_path, num_of_rows, num_of_columns)'.
+
+	The 4x4 and 4x5 boards take seconds and the 5x5 board about two minutes and 250 megabyte of memory.
+	The packed index of the 5x6 board needs 16 gigabyte of memory, so it is out of reach for most computers.
+'''
+
+
+import os
+import time
+
+from game import ConnectFour
+from tablebase import build_tablebase, save_tablebase, Tablebase
+
+
+# Board parameters
+num_of_rows = 4
+num_of_columns = 4
+
+
+# Make directory
+dir_path = './tablebase_data/'
+if not os.path.isdir(dir_path):
+	os.mkdir(dir_path)
+file_path = dir_path + 'tablebase_' + str(num_of_rows) + 'x' + str(num_of_columns) + '.npy'
+
+
+# Solve all positions
+time1 = time.time()
+table = build_tablebase(num_of_rows, num_of_columns)
+save_tablebase(file_path, table)
+time2 = time.time()
+
+
+# Print tablebase info
+tablebase = Tablebase(file_path, num_of_rows, num_of_columns)
+counts = tablebase.counts()
+connectfour = ConnectFour(num_of_rows, num_of_columns)
+print('Tablebase saved in', file_path)
+print('Value of the empty board:', tablebase.value(connectfour), ' | best actions:', tablebase.best_actions(connectfour))
+print('Number of positions:', sum(counts.values()), ' | draw:', counts['draw'], ' | x wins:', counts['x wins'], ' | o wins:', counts['o wins'])
+print('Memory size:', len(table), 'bytes which is around', round(len(table)/1000000, 1), 'megabyte')
+print('Duration:', round(time2 - time1, 1), 'seconds')
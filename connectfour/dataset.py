@@ -0,0 +1,159 @@
+'''Dataset of labelled positions
+
+This file contains the tools to train the network of the class 'DeepPlayer' offline from positions
+whose values were computed by a search. Comments:
+
+	A position is stored as its encoding for the network (see 'preprocess' in 'players.py') and its
+	value in [-1,1] from the view of player x. The value is the result of an Alpha-beta search
+	of depth 'depth' (see 'PrunPlayer' in 'players.py').
+
+	The positions are written in shards by the class 'ShardWriter'. Every shard consists of the files
+	'states_#.npy' and 'values_#.npy', and 'dataset_info.pickle' describes all shards of the dataset.
+
+	The class 'ShardedDataset' streams minibatches from the shards. The shards are memory-mapped,
+	so only the drawn minibatches are read and the dataset does not need to fit into memory.
+	With 'dataset_loader' the minibatches can be read by several worker processes.
+'''
+
+
+import os
+import pickle
+import random
+import numpy as np
+import torch
+
+from math import inf as infinity
+
+from players import PrunPlayer
+from pnsearch import solve
+
+
+def searched_value(game, depth, node_budget=None, table=None):
+	'''Returns the value of the position of 'game' according to an Alpha-beta search of depth 'depth'
+
+		If 'node_budget' is not None, positions that a proof-number search with this budget solves
+		get their exact value instead. 'table' is the transposition table of the proof-number search.
+	'''
+
+	if node_budget is not None:
+		value = solve(game, node_budget, table)
+		if value is not None:
+			return value
+	return PrunPlayer(depth).Phi(game, -infinity, infinity, depth)
+
+
+def labelled_positions(game, number_of_positions, depth, max_random_actions=None, node_budget=None):
+	'''Returns the encodings and the searched values of positions reached by random actions
+
+		'game' has to track its features. Every position that is reached on the way is labelled,
+		including the terminal ones. See 'searched_value' for 'node_budget'.
+	'''
+
+	if max_random_actions is None:
+		max_random_actions = game.max_time
+	states = []
+	values = []
+	table = {}
+	while len(states) < number_of_positions:
+		game.reset()
+		for k in range(random.randint(1, max_random_actions)):
+			game.execute(random.choice(game.legal_actions()))
+			states.append(list(game.features))
+			values.append(searched_value(game, depth, node_budget, table))
+			if game.terminated or len(states) == number_of_positions:
+				break
+	game.reset()
+	return np.array(states, dtype=np.uint8), np.array(values, dtype=np.float32)
+
+
+class ShardWriter:
+	def __init__(self, dir_path, input_dim, shard_size, info=None):
+		self.dir_path = dir_path
+		self.input_dim = input_dim
+		self.shard_size = shard_size
+		self.info = {} if info is None else info
+		self.shard_sizes = []
+		self.states = []
+		self.values = []
+		self.size = 0
+		if not os.path.isdir(dir_path):
+			os.makedirs(dir_path)
+
+	def add(self, states, values):
+		'''Adds a batch of encoded states and their values, full shards are written to the disk'''
+
+		self.states.append(states)
+		self.values.append(values)
+		self.size += len(states)
+		while self.size >= self.shard_size:
+			self.write_shard(self.shard_size)
+
+	def write_shard(self, shard_size):
+		states = np.concatenate(self.states)
+		values = np.concatenate(self.values)
+		index = len(self.shard_sizes)
+
+		shard = np.lib.format.open_memmap(self.dir_path + '/states_' + str(index) + '.npy', mode='w+', dtype=np.uint8, shape=(shard_size, self.input_dim))
+		shard[:] = states[:shard_size]
+		shard.flush()
+		del shard
+		np.save(self.dir_path + '/values_' + str(index) + '.npy', values[:shard_size])
+
+		self.shard_sizes.append(shard_size)
+		self.states = [states[shard_size:]]
+		self.values = [values[shard_size:]]
+		self.size -= shard_size
+
+	def close(self):
+		'''Writes the remaining positions and the file 'dataset_info.pickle' '''
+
+		if self.size > 0:
+			self.write_shard(self.size)
+		self.info['input_dim'] = self.input_dim
+		self.info['shard_sizes'] = self.shard_sizes
+		self.info['number_of_positions'] = sum(self.shard_sizes)
+		with open(self.dir_path + '/dataset_info.pickle', 'wb') as file:
+			pickle.dump(self.info, file)
+
+
+class ShardedDataset(torch.utils.data.IterableDataset):
+	'''Yields minibatches of encoded states and targets of the network
+
+		The shards are visited in random order and the positions of a shard are shuffled.
+		If the dataset is read by several workers, every worker reads its own shards.
+	'''
+
+	def __init__(self, dir_path, batch_size):
+		super().__init__()
+		self.dir_path = dir_path
+		self.batch_size = batch_size
+		with open(dir_path + '/dataset_info.pickle', 'rb') as file:
+			self.info = pickle.load(file)
+
+	def __len__(self):
+		return sum(-(-size//self.batch_size) for size in self.info['shard_sizes'])
+
+	def __iter__(self):
+		indices = list(range(len(self.info['shard_sizes'])))
+		worker_info = torch.utils.data.get_worker_info()
+		if worker_info is not None:
+			indices = indices[worker_info.id::worker_info.num_workers]
+		random.shuffle(indices)
+
+		for index in indices:
+			states = np.load(self.dir_path + '/states_' + str(index) + '.npy', mmap_mode='r')
+			values = np.load(self.dir_path + '/values_' + str(index) + '.npy', mmap_mode='r')
+			permutation = torch.randperm(len(states)).numpy()
+			for k in range(0, len(states), self.batch_size):
+				# Sorted indices read the memory-mapped shard in one direction
+				batch = np.sort(permutation[k:k + self.batch_size])
+				x = torch.from_numpy(states[batch].astype(np.float32))
+				# The target of a value v in [-1,1] is 0.5*v + 0.5 as in the training by self-play
+				target = torch.from_numpy(0.5*values[batch] + 0.5).view(-1, 1)
+				yield x, target
+
+
+def dataset_loader(dir_path, batch_size, number_of_workers=0):
+	'''Returns a 'DataLoader' that streams the minibatches of the dataset in 'dir_path' '''
+
+	return torch.utils.data.DataLoader(ShardedDataset(dir_path, batch_size), batch_size=None, num_workers=number_of_workers)
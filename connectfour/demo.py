@@ -7,11 +7,9 @@ Run this file to view a game, you will receive constructions in the console.
 	players from the directory './training_data/training_1/'
 '''
 
-import pickle
-
 from game import ConnectFour
 from players import HumanPlayer, RandomPlayer, PrunPlayer, ChainPlayer
-from tools import play
+from tools import play, load_deepplayer
 
 
 # Initialize games
@@ -32,8 +30,7 @@ index = 21
 
 # Load trained players
 dir_path = './training_data/training_' + str(index)
-with open(dir_path + '/deepplayer.pickle', 'rb') as file:
-	deepplayer = pickle.load(file)
+deepplayer = load_deepplayer(dir_path)
 
 deepplayer.epsilon = 0
 
@@ -11,6 +11,27 @@ You can specify the number with the variable 'games_per_pair'.
 
 Every time this file is run, it creates an new directory './evaluation_data/evaluation_#_##'
 where '#' stands for the index you chose and '##' is the index unique to every evaluation session.
+
+	If you set 'measure_latency = True', every call of 'choice' is timed and a latency report
+	per player and per move number is saved next to the scores. Players whose p99 latency exceeds
+	'latency_budget' (in seconds) are marked in the report.
+
+	If you set 'batched = True', the games of every pair are played in lockstep, up to
+	'number_of_parallel_games' at a time, and the Deep Player evaluates the positions of all
+	running games in one forward pass per move. Latencies are not measured in this mode.
+
+	With the variable 'precision' the Deep Player can be evaluated with its network in int8
+	(dynamic quantization) or bfloat16. Before the evaluation, the share of 1000 random positions
+	in which it chooses the same move as in float32 is printed.
+
+	If 'cache_capacity' is a number, the Deep Player keeps the values of up to that many positions
+	in a cache instead of evaluating them again. The hit rate of the cache is printed in the end.
+
+	If 'tabular_index' is a number, the Q Player and the TD Player in the directory
+	'./training_data/tabular_#/' (see 'tabular_training.py') are evaluated as well.
+
+	If you set 'profile' in 'profile_parameters' to True, the evaluation is profiled (see 'profiling.py')
+	and the results are saved next to the scores. The batched evaluation is not profiled.
 '''
 
 
@@ -19,11 +40,18 @@ import os
 
 from game import ConnectFour
 from players import RandomPlayer, ChainPlayer, PrunPlayer
-from tools import evaluation, visualize_scores
+from tools import evaluation, batched_evaluation, visualize_scores, save_latency_report, load_deepplayer
+from tools import reduced_precision_player, random_positions, move_agreement
+from valuecache import ValueCache
+from profiling import Profiler
 
 
-# Initialize game
-connectfour = ConnectFour()
+# Initialize game, it keeps the encoding of its position for the network up to date, so the Deep Player
+# does not encode the board again for every candidate action. If 'track_chains' is True the game keeps the
+# chain lengths that the Chain Players read up to date. This makes the Chain Players faster and the search
+# of the Prun Players slower
+track_chains = False
+connectfour = ConnectFour(track_features=True, track_chains=track_chains)
 
 
 # Initialize players that do not need training
@@ -38,24 +66,82 @@ dchainplayer = ChainPlayer(type='deffensive')
 index = 1
 
 
+# Choose the precision of the Deep Player: 'float32', 'int8' or 'bfloat16'
+precision = 'float32'
+
+
 # Load trained player
 dir_path = './training_data/training_' + str(index)
-with open(dir_path + '/deepplayer.pickle', 'rb') as file:
-	deepplayer = pickle.load(file)
+deepplayer = load_deepplayer(dir_path, scripted=(precision == 'float32'))
 
 
 # Declare epsilon for each trained player
 deepplayer.epsilon = 0
 
 
+# If True, the Deep Player plays immediate wins and forced blocks without evaluating the network
+deepplayer.tactical = False
+
+
+# Choose the number of positions whose values the Deep Player caches or None for no cache
+cache_capacity = 100000
+if cache_capacity is not None:
+	deepplayer.cache = ValueCache(cache_capacity)
+
+
+# Reduce the precision and check how often the reduced player chooses the same move
+if precision != 'float32':
+	reduced_deepplayer = reduced_precision_player(deepplayer, precision)
+	agreement = move_agreement(deepplayer, reduced_deepplayer, random_positions(connectfour, 1000))
+	print('Move agreement of', reduced_deepplayer.name, 'with float32:', round(100*agreement, 1), '%')
+	print()
+	deepplayer = reduced_deepplayer
+
+
+# Choose the index of a directory with trained tabular players or None
+tabular_index = None
+tabular_players = []
+if tabular_index is not None:
+	for name in ['qplayer', 'tdplayer']:
+		with open('./training_data/tabular_' + str(tabular_index) + '/' + name + '.pickle', 'rb') as file:
+			player = pickle.load(file)
+		player.epsilon = 0
+		tabular_players.append(player)
+
+
 # Evaluation parameters
-players = [randomplayer, prun3player, prun8player, ochainplayer, dchainplayer, deepplayer]
+players = [randomplayer, prun3player, prun8player, ochainplayer, dchainplayer, deepplayer] + tabular_players
 games_per_pair = 100
 first_action_random = True
+measure_latency = False
+latency_budget = 0.1
+batched = False
+number_of_parallel_games = 100
+
+# The windows of cProfile and torch.profiler are (first game, number of games) or None
+profile_parameters = {
+	'profile' : False,
+	'cprofile_games' : (1, 100),
+	'phase_timers' : True,
+	'torch_profiler_games' : (501, 10)
+}
 
 
 # Evaluation
-scores = evaluation(connectfour, players, games_per_pair, first_action_random)
+if batched:
+	measure_latency = False
+	scores = batched_evaluation(connectfour, players, games_per_pair, first_action_random, number_of_parallel_games)
+else:
+	latencies = {} if measure_latency else None
+	profiler = Profiler(profile_parameters['cprofile_games'], profile_parameters['phase_timers'], profile_parameters['torch_profiler_games']) if profile_parameters['profile'] else None
+	scores = evaluation(connectfour, players, games_per_pair, first_action_random, latencies, profiler)
+
+
+# Print cache statistics
+if deepplayer.cache is not None:
+	statistics = deepplayer.cache.statistics()
+	print('Cache of', deepplayer.name, '| hits:', statistics['hits'], '| misses:', statistics['misses'], '| hit rate:', round(100*statistics['hit_rate'], 1), '%')
+	print()
 
 
 # Create directory to save scores
@@ -80,4 +166,14 @@ with open(dir_path + '/scores.pickle', 'wb') as file:
 
 
 # Visualize scores
-visualize_scores(dir_path + '/scores.pickle')
\ No newline at end of file
+visualize_scores(dir_path + '/scores.pickle')
+
+
+# Save latency report
+if measure_latency:
+	save_latency_report(dir_path + '/latency.pickle', latencies, latency_budget)
+
+
+# Save profile
+if not batched and profiler is not None:
+	profiler.save(dir_path)
\ No newline at end of file
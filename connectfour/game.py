@@ -12,11 +12,32 @@ The most important function is 'execute(self, action)':
 
 	An action is a value in the set {0,...,num_of_columns} and it denotes a position on the board.
 	When the function is executed, it changes the internal values accordingly.
+
+If the game is created with 'track_features=True', it keeps the encoding of the position that is
+the input of the network of the 'DeepPlayer' in the float array 'features' (see 'preprocess' in 'players.py').
+'execute' and 'undo' only change the entries of the affected cell and of the player to move.
+
+If the game is created with 'track_chains=True', it keeps for both players, every cell and each of the
+eight directions the number of discs of the player in a row next to the cell (at most 3), and the row
+in which a disc lands in every column. 'execute' and 'undo' only update the cells next to the changed
+cell, so 'chain_length' and 'landing_row' are answered without walking the board.
+
+The position is also kept as bitboards: column j of the board is given by the bits j*(num_of_rows+1) to
+j*(num_of_rows+1) + num_of_rows - 1 (from the bottom to the top) of 'mask' (all discs) and of 'bits[0]'
+(discs of player x) and 'bits[1]' (discs of player o). With them 'winning_actions', 'blocking_actions'
+and 'safe_actions' find immediate wins and threats in a number of steps that only depends on the columns.
 '''
 
 
+from array import array
+
+
+# Directions (row, column) in pairs of opposite directions, in the order of the lines of 'counter'
+DIRECTIONS = [(-1,-1), (1,1), (0,-1), (0,1), (1,-1), (-1,1), (1,0), (-1,0)]
+
+
 class ConnectFour:
-	def __init__(self, num_of_rows=6, num_of_columns=7):
+	def __init__(self, num_of_rows=6, num_of_columns=7, track_features=False, track_chains=False):
 		self.name = 'ConnectFour' + str(num_of_rows) + str(num_of_columns)
 		self.num_of_rows = num_of_rows
 		self.num_of_columns = num_of_columns
@@ -26,6 +47,15 @@ class ConnectFour:
 		self.max_time = self.num_of_rows*self.num_of_columns
 		self.terminated = False
 		self.winner = None
+		self.track_features = track_features
+		self.features = self.initial_features() if track_features else None
+		self.track_chains = track_chains
+		self.reset_chains()
+
+		self.bottom_mask = sum(1 << j*(num_of_rows + 1) for j in range(num_of_columns))
+		self.board_mask = self.bottom_mask*((1 << num_of_rows) - 1)
+		self.bits = [0, 0]
+		self.mask = 0
 
 	def reset(self):
 		self.board = [[0 for j in range(self.num_of_columns)] for i in range(self.num_of_rows)]
@@ -33,6 +63,156 @@ class ConnectFour:
 		self.time = 0
 		self.terminated = False
 		self.winner = None
+		self.features = self.initial_features() if self.track_features else None
+		self.reset_chains()
+		self.bits = [0, 0]
+		self.mask = 0
+
+	def reset_chains(self):
+		if self.track_chains:
+			self.runs = [0]*(2*self.num_of_rows*self.num_of_columns*8)
+			self.landing_rows = [self.num_of_rows - 1]*self.num_of_columns
+			if getattr(self, 'rays', None) is None:
+				self.rays = self.chain_rays()
+		else:
+			self.runs = None
+			self.landing_rows = None
+			self.rays = None
+
+	def chain_rays(self):
+		'''Returns for every cell and direction the cells whose runs in that direction pass through the cell
+
+			A cell of a ray is given by its row, its column and the index of its run in 'runs'.
+		'''
+
+		rays = []
+		for row in range(self.num_of_rows):
+			for column in range(self.num_of_columns):
+				for d in range(8):
+					dr, dc = DIRECTIONS[d]
+					ray = []
+					for k in range(1, 4):
+						r, c = row - k*dr, column - k*dc
+						if not (0 <= r < self.num_of_rows and 0 <= c < self.num_of_columns):
+							break
+						ray.append((r, c, (r*self.num_of_columns + c)*8 + d))
+					rays.append(ray)
+		return rays
+
+	def update_chains(self, player, row, column, placed):
+		'''Updates the runs of the cells next to (row, column) after a disc of 'player' was placed or removed
+
+			The run of a cell in a direction only changes if the cells between it and (row, column)
+			belong to 'player', so every direction is followed at most 3 cells.
+		'''
+
+		board = self.board
+		runs = self.runs
+		offset = 0 if player == 1 else self.num_of_rows*self.num_of_columns*8
+		k0 = (row*self.num_of_columns + column)*8
+		for d in range(8):
+			beyond = runs[offset + k0 + d] if placed else -1
+			k = 1
+			for r, c, index in self.rays[k0 + d]:
+				runs[offset + index] = min(3, k + beyond)
+				if board[r][c] != player:
+					break
+				k += 1
+
+	def landing_row(self, column):
+		'''Returns the row in which a disc lands in 'column' or -1 if the column is full'''
+
+		if self.landing_rows is not None:
+			return self.landing_rows[column]
+		for i in range(self.num_of_rows-1,-1,-1):
+			if self.board[i][column] == 0:
+				return i
+		return -1
+
+	def chain_length(self, player, row, column, line):
+		'''Returns the same count as 'counter', in constant time if the game tracks chains'''
+
+		if self.runs is None:
+			return self.counter(player, row, column, line)
+		k = (0 if player == 1 else self.num_of_rows*self.num_of_columns*8) + (row*self.num_of_columns + column)*8 + 2*(line - 1)
+		if line == 4:
+			return 1 + self.runs[k]
+		return 1 + self.runs[k] + self.runs[k + 1]
+
+	def column_mask(self, column):
+		return ((1 << self.num_of_rows) - 1) << column*(self.num_of_rows + 1)
+
+	def winning_cells(self, bits):
+		'''Returns the bitboard of the empty cells that complete four in a row of the discs 'bits' '''
+
+		h = self.num_of_rows
+		# Vertical
+		r = (bits << 1) & (bits << 2) & (bits << 3)
+		# Horizontal and both diagonals
+		for shift in [h + 1, h, h + 2]:
+			b = (bits << shift) & (bits << 2*shift)
+			r |= b & (bits << 3*shift)
+			r |= b & (bits >> shift)
+			b = (bits >> shift) & (bits >> 2*shift)
+			r |= b & (bits << shift)
+			r |= b & (bits >> 3*shift)
+		return r & (self.board_mask ^ self.mask)
+
+	def playable_cells(self):
+		'''Returns the bitboard of the cells in which a disc lands'''
+
+		return (self.mask + self.bottom_mask) & self.board_mask
+
+	def actions_of_cells(self, cells):
+		return [j for j in range(self.num_of_columns) if cells & self.column_mask(j)]
+
+	def winning_actions(self):
+		'''Returns the actions with which the player to move wins immediately'''
+
+		own = self.bits[0 if self.player == 1 else 1]
+		return self.actions_of_cells(self.winning_cells(own) & self.playable_cells())
+
+	def blocking_actions(self):
+		'''Returns the actions with which the opponent would win immediately, so they have to be blocked'''
+
+		opponent = self.bits[1 if self.player == 1 else 0]
+		return self.actions_of_cells(self.winning_cells(opponent) & self.playable_cells())
+
+	def safe_actions(self):
+		'''Returns the actions after which the opponent cannot win immediately
+
+			If the opponent threatens to win in one column, only blocking it is safe. If the opponent
+			threatens to win in two columns, no action is safe. An action below a cell in which the
+			opponent would win is never safe.
+		'''
+
+		opponent_wins = self.winning_cells(self.bits[1 if self.player == 1 else 0])
+		cells = self.playable_cells()
+		forced = cells & opponent_wins
+		if forced:
+			if forced & (forced - 1):
+				return []
+			cells = forced
+		return self.actions_of_cells(cells & ~(opponent_wins >> 1))
+
+	def initial_features(self):
+		'''Returns the encoding of the empty board with player x to move
+
+			Every cell is encoded by three entries (x, o, empty) and the player to move by two entries (x, o).
+		'''
+
+		number_of_cells = self.num_of_rows*self.num_of_columns
+		return array('f', [0, 0, 1]*number_of_cells + [1, 0])
+
+	def flip_features(self, row, column):
+		'''Switches the entries of a cell between empty and the player to move and switches the player to move'''
+
+		k = (row*self.num_of_columns + column)*3
+		features = self.features
+		features[k if self.player == 1 else k + 1] = 1 - features[k if self.player == 1 else k + 1]
+		features[k + 2] = 1 - features[k + 2]
+		features[-2] = 1 - features[-2]
+		features[-1] = 1 - features[-1]
 
 	def render(self):
 		for i in range(self.num_of_rows):
@@ -125,7 +305,7 @@ class ConnectFour:
 				break
 
 		for line in [1,2,3,4]:
-			count = self.counter(self.player,row,action,line)
+			count = self.chain_length(self.player,row,action,line)
 			if count >= 4:
 				return True
 
@@ -135,6 +315,17 @@ class ConnectFour:
 				self.board[i][action] = self.player
 				break
 
+		if self.features is not None:
+			self.flip_features(i, action)
+
+		if self.runs is not None:
+			self.landing_rows[action] = i - 1
+			self.update_chains(self.player, i, action, True)
+
+		bit = 1 << (action*(self.num_of_rows + 1) + self.num_of_rows - 1 - i)
+		self.mask |= bit
+		self.bits[0 if self.player == 1 else 1] |= bit
+
 		if self.is_winner(action):
 			self.winner = 'x' if self.player == 1 else 'o'
 			self.terminated = True
@@ -154,4 +345,15 @@ class ConnectFour:
 		for i in range(self.num_of_rows):
 			if self.board[i][action] != 0:
 				self.board[i][action] = 0
-				break
\ No newline at end of file
+				break
+
+		if self.features is not None:
+			self.flip_features(i, action)
+
+		if self.runs is not None:
+			self.landing_rows[action] = i
+			self.update_chains(self.player, i, action, False)
+
+		bit = 1 << (action*(self.num_of_rows + 1) + self.num_of_rows - 1 - i)
+		self.mask ^= bit
+		self.bits[0 if self.player == 1 else 1] ^= bit
\ No newline at end of file
@@ -10,80 +10,141 @@ This file can be run to receive information on the game tree.
 	Also, you can specify a parameter 'depth' which is a natural number and says up to
 	what depth the game tree should be travered.
 
-The function 'Phi' traverses the game tree.
+The function 'traverse' traverses the game tree. Comments:
+
+	The tree is traversed with an explicit stack instead of recursive calls, so the depth is only
+	limited by the time it takes. Every visited board is stored as its 64-bit key (see 'board_key' in
+	'hashtable.py') in a 'KeySet', so the memory size that is printed is the size of all stored keys.
+	The numbers of visited nodes and leaves are counted for every depth.
+
+The function 'traverse_parallel' traverses a non-pruned game tree in parallel. Comments:
+
+	The tree is first traversed up to depth 'frontier_depth'. The boards at this depth (the frontier)
+	are deduplicated by their keys, so every board is only searched once and its counts are multiplied
+	by the number of ways it is reached. The subtrees of the frontier boards are traversed by
+	'number_of_processes' processes (the processes are forked, so this requires a Unix system).
+	The processes return their keys, which are merged into one 'KeySet', so boards that are
+	visited by several processes are only counted once.
 '''
 
 
-import random
+import time
+import multiprocessing
 
+from array import array
+from copy import deepcopy
 from math import inf as infinity
-from sys import getsizeof
 
 from game import ConnectFour
+from hashtable import KeySet
 
 
-def Phi(game, V, alpha, beta, prun, depth):
-	state = []
-	for row in game.board:
-		state += row
-	state = tuple(state)
-
+def leaf_value(game):
 	if game.terminated:
 		if game.winner == 'x':
-			V[state] = 1
-			return 1, 1, 1
+			return 1
 		elif game.winner == 'o':
-			V[state] = -1
-			return -1, 1, 1
+			return -1
 		else:
-			V[state] = 0
-			return 0, 1, 1
-	elif depth == 0:
-		if game.player == 1:
-			v = 0.5
-			V[state] = v
-			return v, 1, 1
-		else:
-			v = -0.5
-			V[state] = v
-			return v, 1, 1
+			return 0
+	elif game.player == 1:
+		return 0.5
 	else:
+		return -0.5
+
+
+def traverse(game, keys, prun, depth, leaf=leaf_value):
+	'''Returns the value of the position of 'game' and the numbers of visited nodes and leaves per depth
+
+		The key of every visited board is added to 'keys'. The value of a board at depth 'depth'
+		that is not terminal is 'leaf(game)'.
+	'''
+
+	nodes = [0]*(depth + 1)
+	leaves = [0]*(depth + 1)
+	keys.add(game.mask + game.bits[0] + game.bottom_mask)
+	nodes[0] += 1
+	if game.terminated or depth == 0:
+		leaves[0] += 1
+		return leaf_value(game) if game.terminated else leaf(game), nodes, leaves
+
+	# A frame is [actions, number of executed actions, value, alpha, beta] of a node
+	stack = [[game.legal_actions(), 0, -infinity if game.player == 1 else infinity, -infinity, infinity]]
+	while True:
+		frame = stack[-1]
+		actions, k, v, alpha, beta = frame
+		if k == len(actions) or (prun and alpha >= beta):
+			stack.pop()
+			if not stack:
+				return v, nodes, leaves
+			frame = stack[-1]
+			game.undo(frame[0][frame[1] - 1])
+			e = v
+		else:
+			frame[1] += 1
+			game.execute(actions[k])
+			d = len(stack)
+			keys.add(game.mask + game.bits[0] + game.bottom_mask)
+			nodes[d] += 1
+			if not game.terminated and d < depth:
+				stack.append([game.legal_actions(), 0, -infinity if game.player == 1 else infinity, frame[3], frame[4]])
+				continue
+			leaves[d] += 1
+			e = leaf_value(game) if game.terminated else leaf(game)
+			game.undo(actions[k])
+
+		# Player x maximizes and player o minimizes
 		if game.player == 1:
-			v = -infinity
-			count1 = 0
-			count2 = 0
-			for action in game.legal_actions():
-				game.execute(action)
-				e, c1, c2 = Phi(game, V, alpha, beta, prun, depth-1)
-				v = max(v, e)
-				count1 += c1
-				count2 += c2
-				if prun:
-					alpha = max(alpha,e)
-					if alpha >= beta:
-						game.undo(action)
-						break
-				game.undo(action)
-			V[state] = v
-			return v, count1 + 1, count2
+			frame[2] = max(frame[2], e)
+			if prun:
+				frame[3] = max(frame[3], e)
 		else:
-			v = infinity
-			count1 = 0
-			count2 = 0
-			for action in game.legal_actions():
-				game.execute(action)
-				e, c1, c2 = Phi(game, V, alpha, beta, prun, depth-1)
-				v = min(v, e)
-				count1 += c1
-				count2 += c2
-				if prun:
-					beta = min(beta, e)
-					if alpha >= beta:
-						game.undo(action)
-						break
-				game.undo(action)
-			V[state] = v
-			return v, count1 + 1, count2
+			frame[2] = min(frame[2], e)
+			if prun:
+				frame[4] = min(frame[4], e)
+
+
+def traverse_subtree(args):
+	game, depth = args
+	keys = KeySet()
+	value, nodes, leaves = traverse(game, keys, False, depth)
+	return game.mask + game.bits[0] + game.bottom_mask, value, nodes, leaves, array('Q', keys)
+
+
+def traverse_parallel(game, keys, depth, frontier_depth, number_of_processes):
+	'''Returns the same as 'traverse(game, keys, False, depth)' if 'frontier_depth' is smaller than 'depth' '''
+
+	# Collect the frontier: key -> [board, number of ways it is reached]
+	frontier = {}
+
+	def collect(game):
+		key = game.mask + game.bits[0] + game.bottom_mask
+		if key in frontier:
+			frontier[key][1] += 1
+		else:
+			frontier[key] = [deepcopy(game), 1]
+		return 0
+
+	value, nodes, leaves = traverse(game, keys, False, frontier_depth, collect)
+	nodes += [0]*(depth - frontier_depth)
+	leaves += [0]*(depth - frontier_depth)
+
+	# Traverse the subtrees of the frontier boards and merge their counts and keys
+	values = {}
+	tasks = [(board, depth - frontier_depth) for board, multiplicity in frontier.values()]
+	with multiprocessing.get_context('fork').Pool(number_of_processes) as pool:
+		for key, value, subtree_nodes, subtree_leaves, subtree_keys in pool.imap_unordered(traverse_subtree, tasks, chunksize=4):
+			multiplicity = frontier[key][1]
+			values[key] = value
+			leaves[frontier_depth] -= multiplicity
+			for d in range(1, depth - frontier_depth + 1):
+				nodes[frontier_depth + d] += multiplicity*subtree_nodes[d]
+				leaves[frontier_depth + d] += multiplicity*subtree_leaves[d]
+			keys.update(subtree_keys)
+
+	# The value of the root follows from the values of the frontier boards
+	value, _, _ = traverse(game, keys, False, frontier_depth, lambda game: values[game.mask + game.bits[0] + game.bottom_mask])
+	return value, nodes, leaves
 
 
 # Initialize game
@@ -95,20 +156,39 @@ prun = True
 depth = 8
 
 
+# Set parallel parameters, they are only used if 'prun' is 'False'
+parallel = False
+frontier_depth = 3
+number_of_processes = multiprocessing.cpu_count()
+
+
 # Print info
 print('Game tree info of', connectfour.name, 'with root node:', connectfour.board)
 print('prun:', prun, ' | depth:', depth)
+if parallel and not prun:
+	print('frontier depth:', frontier_depth, ' | number of processes:', number_of_processes)
 print()
 
-V = {}
-value_of_empty_board, number_of_nodes, number_of_leaves = Phi(connectfour, V, -infinity, infinity, prun, depth)
-number_of_boards = len(V)
-size = getsizeof(V)
+keys = KeySet()
+time1 = time.time()
+if parallel and not prun and frontier_depth < depth:
+	value_of_empty_board, nodes, leaves = traverse_parallel(connectfour, keys, depth, frontier_depth, number_of_processes)
+else:
+	value_of_empty_board, nodes, leaves = traverse(connectfour, keys, prun, depth)
+time2 = time.time()
+number_of_nodes = sum(nodes)
+number_of_leaves = sum(leaves)
+size = keys.memory_size()
 
 print('Value of root node:', value_of_empty_board)
 print()
 print('Number of visited nodes:', number_of_nodes)
 print('Number of visited leaves:', number_of_leaves)
-print('Number of visited boards:', number_of_boards)
+print('Number of visited boards:', len(keys))
+print()
+print('Depth | nodes | leaves')
+for d in range(depth + 1):
+	print(d, '|', nodes[d], '|', leaves[d])
 print()
-print('Memory size of V:', size, 'bytes whis is around', round(size/1000000, 1), 'megabyte')
\ No newline at end of file
+print('Duration:', round(time2 - time1, 1), 'seconds which is around', round(number_of_nodes/max(time2 - time1, 1e-9)), 'nodes per second')
+print('Memory size of the keys:', size, 'bytes which is around', round(size/1000000, 1), 'megabyte')
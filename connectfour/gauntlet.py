@@ -0,0 +1,132 @@
+'''Gauntlet
+
+This file can be run to evaluate all trained Deep Players at once.
+Every directory './training_data/training_#/' that contains a trained Deep Player is a checkpoint.
+Each checkpoint plays 'games_per_pair' games as player x and as player o against every player
+in the list 'opponents'. The checkpoints are evaluated in parallel by 'number_of_processes'
+processes (the processes are forked, so this requires a Unix system).
+
+	Only the weights of the networks are loaded. The first time a checkpoint is evaluated,
+	its pickled player is converted once into the file 'deepplayer_weights.pt'.
+
+	The results are saved in './evaluation_data/gauntlet.pickle'. Checkpoints that were already
+	scored against the same opponents with the same number of games are skipped.
+
+In the end a table of all checkpoints ranked by their points is printed and saved in
+'./evaluation_data/gauntlet.txt'. A win counts 1 point and a draw counts 0.5 points.
+'''
+
+
+import os
+import pickle
+import random
+import multiprocessing
+import torch
+
+from game import ConnectFour
+from players import RandomPlayer, ChainPlayer, PrunPlayer
+from tools import load_weights, extract_weights, gauntlet_scores
+
+
+# Initialize game
+connectfour = ConnectFour()
+
+
+# Fixed set of opponents
+opponents = [RandomPlayer(), PrunPlayer(depth=3), ChainPlayer(type='offensive'), ChainPlayer(type='deffensive')]
+
+
+# Gauntlet parameters
+games_per_pair = 100
+first_action_random = True
+number_of_processes = os.cpu_count()
+
+
+def evaluate_checkpoint(index):
+	random.seed()
+	torch.set_num_threads(1)
+	deepplayer = load_weights('./training_data/training_' + str(index) + '/deepplayer_weights.pt')
+	return index, gauntlet_scores(connectfour, deepplayer, opponents, games_per_pair, first_action_random)
+
+
+# Discover checkpoints
+indices = []
+for name in os.listdir('./training_data/'):
+	dir_path = './training_data/' + name
+	if name.startswith('training_') and name[9:].isdigit():
+		if os.path.isfile(dir_path + '/deepplayer.pickle') or os.path.isfile(dir_path + '/deepplayer_weights.pt'):
+			indices.append(int(name[9:]))
+indices.sort()
+
+
+# Load results of previous gauntlets
+dir_path = './evaluation_data/'
+if not os.path.isdir(dir_path):
+	os.mkdir(dir_path)
+file_path = dir_path + 'gauntlet.pickle'
+if os.path.isfile(file_path):
+	with open(file_path, 'rb') as file:
+		all_results = pickle.load(file)
+else:
+	all_results = {}
+
+setting = (tuple(opponent.name for opponent in opponents), games_per_pair, first_action_random)
+results = all_results.setdefault(setting, {})
+new_indices = [index for index in indices if index not in results]
+already_scored = len(indices) - len(new_indices)
+
+
+# Convert pickled players into weights once, players pickled with outdated classes are skipped
+for index in list(new_indices):
+	path = './training_data/training_' + str(index)
+	if not os.path.isfile(path + '/deepplayer_weights.pt'):
+		try:
+			extract_weights(path)
+		except (AttributeError, ModuleNotFoundError, pickle.UnpicklingError) as error:
+			print('Skip training_' + str(index) + ':', error)
+			new_indices.remove(index)
+
+
+# Evaluate new checkpoints
+print('Gauntlet of', len(indices), 'checkpoints,', already_scored, 'already scored')
+print()
+
+with multiprocessing.get_context('fork').Pool(number_of_processes) as pool:
+	for index, result in pool.imap_unordered(evaluate_checkpoint, new_indices):
+		results[index] = result
+		with open(file_path, 'wb') as file:
+			pickle.dump(all_results, file)
+		print('training_' + str(index), 'scored', result['points'], 'points in', result['games'], 'games')
+print()
+
+
+# Ranked table
+ranking = sorted([index for index in indices if index in results], key=lambda index: -results[index]['points'])
+
+header = 'Rank | Checkpoint | Layers | Dim | Games trained | Points'
+for opponent in opponents:
+	header += ' | ' + opponent.name + ' (w/d/l)'
+lines = [header]
+for rank, index in enumerate(ranking, 1):
+	with open('./training_data/training_' + str(index) + '/training_info.pickle', 'rb') as file:
+		training_info = pickle.load(file)
+	result = results[index]
+	line = str(rank) + ' | training_' + str(index)
+	line += ' | ' + str(training_info['num_central_layers']) + ' | ' + str(training_info['central_layer_dim'])
+	line += ' | ' + str(training_info['number_of_games'])
+	line += ' | ' + str(result['points']) + '/' + str(result['games'])
+	for opponent in opponents:
+		win, draw, loss = 0, 0, 0
+		for side in ['x', 'o']:
+			score = result['scores'][(opponent.name, side)]
+			win += score['win']
+			draw += score['draw']
+			loss += score['loss']
+		line += ' | ' + str(win) + '/' + str(draw) + '/' + str(loss)
+	lines.append(line)
+
+for line in lines:
+	print(line)
+
+with open(dir_path + 'gauntlet.txt', 'w') as file:
+	file.write('\n'.join(lines) + '\n')
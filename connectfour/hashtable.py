@@ -0,0 +1,223 @@
+'''Bounded hash table
+
+This file contains the table of values that is used by the classes 'QPlayer' and 'TDPlayer'. Comments:
+
+	A position is identified by a 64-bit key, see 'board_key'. The key of a pair of a position
+	and an action is 'board_key(board)*8 + action', see 'pair_key'. Only on boards with 7 rows and
+	8 columns it does not fit into 64 bits and its highest bits are folded into the lower 64 bits.
+
+	The table has a fixed number of slots, so its memory use does not grow during a training.
+	Keys, values (float32), numbers of visits and times of the last access are stored in flat arrays.
+	A key is looked up by open addressing in a window of 'probe_length' slots.
+
+	If the window of a new key is full, an entry of the window is evicted. With the eviction policy
+	'least_visited' it is the entry with the fewest visits, with 'age' it is the entry that was
+	accessed least recently.
+
+The class 'KeySet' is a set of keys in one flat array without eviction that doubles its number of slots
+when it is half full. It is used to count the different boards of the game tree (see 'game_tree_info.py').
+'''
+
+
+from array import array
+
+
+GOLDEN = 0x9E3779B97F4A7C15
+MASK = (1 << 64) - 1
+MAX_ROWS = 7
+MAX_COLUMNS = 8
+
+
+def board_key(board):
+	'''Returns the 64-bit key of a board of up to 8 columns with up to 7 rows
+
+		Every column gets num_of_rows + 1 bits. The key is the sum of the bits of the cells of player x,
+		the bits of all occupied cells and the bottom bit of every column, so it is unique and never 0.
+	'''
+
+	num_of_rows = len(board)
+	if num_of_rows > MAX_ROWS or len(board[0]) > MAX_COLUMNS:
+		raise ValueError('board keys exist for boards of up to ' + str(MAX_ROWS) + ' rows and ' + str(MAX_COLUMNS) + ' columns')
+	x_bits = 0
+	mask = 0
+	bottom = 0
+	for j in range(len(board[0])):
+		bottom |= 1 << j*(num_of_rows + 1)
+		for i in range(num_of_rows-1, -1, -1):
+			if board[i][j] == 0:
+				break
+			bit = 1 << (j*(num_of_rows + 1) + num_of_rows - 1 - i)
+			mask |= bit
+			if board[i][j] == 1:
+				x_bits |= bit
+	return x_bits + mask + bottom
+
+
+def pair_key(key, action):
+	'''Returns the 64-bit key of the pair of the position with key 'key' and the action 'action'
+
+		The key is key*8 + action, which is unique. If it does not fit into 64 bits, its three highest bits
+		are multiplied by GOLDEN and added to the lower 64 bits, then two pairs have the same key only by chance.
+	'''
+
+	key = key*8 + action
+	if key > MASK:
+		key = ((key & MASK) + (key >> 64)*GOLDEN) & MASK or GOLDEN
+	return key
+
+
+class HashTable:
+	def __init__(self, capacity, eviction='least_visited', probe_length=8):
+		if eviction not in ('least_visited', 'age'):
+			raise ValueError("eviction has to be 'least_visited' or 'age'")
+
+		# The number of slots is rounded up to a power of 2
+		bits = max(1, (capacity - 1).bit_length())
+		self.capacity = 1 << bits
+		self.shift = 64 - bits
+		self.eviction = eviction
+		self.probe_length = min(probe_length, self.capacity)
+
+		self.keys = array('Q', bytes(8*self.capacity))
+		self.values = array('f', bytes(4*self.capacity))
+		self.visits = array('I', bytes(4*self.capacity))
+		self.ages = array('Q', bytes(8*self.capacity))
+
+		self.time = 0
+		self.size = 0
+		self.evictions = 0
+
+	def __len__(self):
+		return self.size
+
+	def __contains__(self, key):
+		return self.slot(key) is not None
+
+	def start(self, key):
+		return ((key*GOLDEN) & MASK) >> self.shift
+
+	def slot(self, key):
+		'''Returns the slot of 'key' or None if it is not in the table'''
+
+		start = self.start(key)
+		for k in range(self.probe_length):
+			i = (start + k) & (self.capacity - 1)
+			stored = self.keys[i]
+			if stored == key:
+				return i
+			if stored == 0:
+				return None
+		return None
+
+	def touch(self, i):
+		if self.visits[i] < 0xFFFFFFFF:
+			self.visits[i] += 1
+		self.time += 1
+		self.ages[i] = self.time
+
+	def get(self, key, default=None):
+		i = self.slot(key)
+		if i is None:
+			return default
+		self.touch(i)
+		return self.values[i]
+
+	def __getitem__(self, key):
+		i = self.slot(key)
+		if i is None:
+			raise KeyError(key)
+		self.touch(i)
+		return self.values[i]
+
+	def __setitem__(self, key, value):
+		start = self.start(key)
+		scores = self.visits if self.eviction == 'least_visited' else self.ages
+		victim = None
+		for k in range(self.probe_length):
+			i = (start + k) & (self.capacity - 1)
+			stored = self.keys[i]
+			if stored == key:
+				break
+			if stored == 0:
+				self.keys[i] = key
+				self.visits[i] = 0
+				self.size += 1
+				break
+			if victim is None or scores[i] < scores[victim]:
+				victim = i
+		else:
+			i = victim
+			self.keys[i] = key
+			self.visits[i] = 0
+			self.evictions += 1
+		self.values[i] = value
+		self.touch(i)
+
+	def memory_size(self):
+		'''Returns the number of bytes of the arrays of the table'''
+
+		return sum(len(a)*a.itemsize for a in [self.keys, self.values, self.visits, self.ages])
+
+	def statistics(self):
+		return {'size': self.size, 'capacity': self.capacity, 'evictions': self.evictions, 'memory_size': self.memory_size()}
+
+
+class KeySet:
+	def __init__(self, capacity=2**16):
+		bits = max(1, (capacity - 1).bit_length())
+		self.capacity = 1 << bits
+		self.shift = 64 - bits
+		self.keys = array('Q', bytes(8*self.capacity))
+		self.size = 0
+
+	def __len__(self):
+		return self.size
+
+	def __contains__(self, key):
+		i = ((key*GOLDEN) & MASK) >> self.shift
+		while True:
+			stored = self.keys[i]
+			if stored == key:
+				return True
+			if stored == 0:
+				return False
+			i = (i + 1) & (self.capacity - 1)
+
+	def __iter__(self):
+		return (key for key in self.keys if key != 0)
+
+	def add(self, key):
+		'''Adds the nonzero key 'key' and returns True if it was not in the set'''
+
+		i = ((key*GOLDEN) & MASK) >> self.shift
+		while True:
+			stored = self.keys[i]
+			if stored == key:
+				return False
+			if stored == 0:
+				break
+			i = (i + 1) & (self.capacity - 1)
+		self.keys[i] = key
+		self.size += 1
+		if 2*self.size > self.capacity:
+			self.grow()
+		return True
+
+	def update(self, keys):
+		for key in keys:
+			self.add(key)
+
+	def grow(self):
+		old_keys = self.keys
+		self.capacity *= 2
+		self.shift -= 1
+		self.keys = array('Q', bytes(8*self.capacity))
+		self.size = 0
+		for key in old_keys:
+			if key != 0:
+				self.add(key)
+
+	def memory_size(self):
+		'''Returns the number of bytes of the array of the set'''
+
+		return len(self.keys)*self.keys.itemsize
@@ -1,13 +1,16 @@
 '''Feedforward neural network
 
 This file contains the Feedforward neural network (FNN) that is used in the
-class 'DeepPlayer'. 
+class 'DeepPlayer'. The function 'net_state_dict' is used to save the weights of a FNN.
+The functions 'script_net' and 'reduced_precision_net' prepare a trained FNN for inference.
 '''
 
 
 import torch
 import torch.nn as nn
 
+from copy import deepcopy
+
 
 class FNN(nn.Module):
 	def __init__(self, input_dim, num_central_layers, central_layer_dim, output_dim):
@@ -15,7 +18,7 @@ class FNN(nn.Module):
 		
 		self.first_layer = nn.Linear(input_dim, central_layer_dim)
 
-		self.central_layers = []
+		self.central_layers = nn.ModuleList()
 		for i in range(num_central_layers):
 			self.central_layers.append(nn.Linear(central_layer_dim, central_layer_dim))
 
@@ -36,4 +39,83 @@ class FNN(nn.Module):
 		out = self.final_layer(out)
 		out = self.sigmoid(out)
 
-		return out
\ No newline at end of file
+		return out
+
+
+def net_state_dict(net):
+	'''Returns the weights of a FNN as a state dict
+
+		Networks that were pickled before the central layers were registered as a 'nn.ModuleList'
+		keep them in a plain list, so they are missing in 'net.state_dict()'. They are added here
+		under the same keys 'central_layers.#.weight' and 'central_layers.#.bias'.
+	'''
+
+	state_dict = net.state_dict()
+	if not isinstance(net.central_layers, nn.ModuleList):
+		for i, layer in enumerate(net.central_layers):
+			for key, value in layer.state_dict().items():
+				state_dict['central_layers.' + str(i) + '.' + key] = value
+	return state_dict
+
+
+def registered(net):
+	'''Returns the FNN itself or, if it was pickled with its central layers in a plain list, a copy with registered layers'''
+
+	if isinstance(net.central_layers, nn.ModuleList):
+		return net
+	copy = FNN(net.first_layer.in_features, len(net.central_layers), net.first_layer.out_features, net.final_layer.out_features)
+	copy.load_state_dict(net_state_dict(net))
+	return copy
+
+
+def script_net(net):
+	'''Returns a frozen TorchScript module of a FNN for inference
+
+		The module can be saved with 'torch.jit.save' and loaded with 'torch.jit.load'
+		without this file.
+	'''
+
+	net = registered(net)
+	net.eval()
+	return torch.jit.freeze(torch.jit.script(net))
+
+
+class BFloat16Net(nn.Module):
+	'''Wraps a network with weights in bfloat16, its inputs and outputs stay in float32'''
+
+	def __init__(self, net):
+		super().__init__()
+		self.net = net
+
+	def forward(self, x):
+		return self.net(x.to(torch.bfloat16)).float()
+
+
+class Int8Net(nn.Module):
+	'''Wraps a network with dynamically quantized linear layers, which need inputs with a batch dimension'''
+
+	def __init__(self, net):
+		super().__init__()
+		self.net = net
+
+	def forward(self, x):
+		if x.dim() == 1:
+			return self.net(x.view(1, -1)).view(-1)
+		return self.net(x)
+
+
+def reduced_precision_net(net, precision):
+	'''Returns a copy of a FNN for inference on a CPU in reduced precision
+
+		Parameter 'precision' lies in {'int8', 'bfloat16'}.
+		With 'int8' the weights of the linear layers are quantized to int8 and the activations
+		are quantized dynamically. With 'bfloat16' all weights and computations are in bfloat16.
+	'''
+
+	net = deepcopy(registered(net)).eval()
+	if precision == 'int8':
+		return Int8Net(torch.ao.quantization.quantize_dynamic(net, {nn.Linear}, dtype=torch.qint8))
+	elif precision == 'bfloat16':
+		return BFloat16Net(net.to(torch.bfloat16))
+	else:
+		raise ValueError('Unknown precision: ' + str(precision))
@@ -0,0 +1,85 @@
+'''Perft
+
+This file can be run to test and benchmark the game engine ('execute', 'undo', 'legal_actions' and 'is_winner').
+Below you can specify the parameters of the benchmark.
+
+	For every position in 'positions' (given by the actions from the empty board) the number of
+	sequences of d actions that can be played from the position is counted for d = 1,...,depth.
+	A sequence ends when the game is terminated, so it only counts if it has exactly d actions.
+	The counts are compared to the stored reference counts, which were checked with an independent
+	implementation of the rules, and the number of executed actions per second is printed.
+
+	Any other implementation of the game with the same functions can be tested and compared by
+	passing its objects to 'perft'.
+'''
+
+
+import sys
+import time
+
+from game import ConnectFour
+
+
+def perft(game, depth):
+	'''Returns the number of sequences of 'depth' actions from the position of 'game' and the number of executed actions'''
+
+	if depth == 0:
+		return 1, 0
+	count = 0
+	number_of_actions = 0
+	for action in game.legal_actions():
+		game.execute(action)
+		number_of_actions += 1
+		if depth == 1:
+			count += 1
+		elif not game.terminated:
+			c, n = perft(game, depth - 1)
+			count += c
+			number_of_actions += n
+		game.undo(action)
+	return count, number_of_actions
+
+
+# Positions of the board with 6 rows and 7 columns and their reference counts for d = 1,...,6
+positions = {
+	'': [7, 49, 343, 2401, 16807, 117649],
+	'3 3 3 3': [7, 49, 342, 2376, 16416, 107736],
+	'0 1 0 1 0 1': [7, 42, 259, 1595, 10057, 63152],
+	'3 2 3 4 4 2 5 6 2 4 1 5': [7, 49, 336, 2231, 14890, 95673],
+	'0 0 0 0 0 0 6 6 6 6 6 6 1 1 1 1 1 1 5 5 5 5 5 5 2 2 2 2 2 3 3 3 3': [3, 8, 14, 29, 45, 73],
+}
+
+
+# Set parameters
+depth = 6
+
+
+# Run perft
+connectfour = ConnectFour(6, 7)
+total_actions = 0
+total_time = 0
+correct = True
+for moves, reference in positions.items():
+	connectfour.reset()
+	for action in moves.split():
+		connectfour.execute(int(action))
+	print('Position:', moves if moves else 'empty board')
+	for d in range(1, depth + 1):
+		time1 = time.time()
+		count, number_of_actions = perft(connectfour, d)
+		time2 = time.time()
+		total_actions += number_of_actions
+		total_time += time2 - time1
+		if d <= len(reference):
+			status = 'ok' if count == reference[d-1] else 'wrong, expected ' + str(reference[d-1])
+			correct = correct and count == reference[d-1]
+		else:
+			status = 'no reference'
+		print('  depth', d, '|', count, '|', status)
+	print()
+
+print('Executed actions:', total_actions, ' | duration:', round(total_time, 1), 'seconds')
+print('Actions per second:', round(total_actions/max(total_time, 1e-9)))
+print('All counts are correct' if correct else 'Some counts are WRONG')
+if not correct:
+	sys.exit(1)
@@ -11,18 +11,48 @@ The class 'DeepPlayer' contains two additional important functions:
 
 	'train_single_game(self, game)' and 'train(...)'. They are the implementations of the pseudocodes
 	that can be found in './reinforcement_learning_for_tictactoe_and_connectfour/pseudocodes.pdf'
+
+	'train_single_game_with_replay(...)' is a variant of 'train_single_game(self, game)' that stores the
+	game in a replay buffer (see 'replaybuffer.py') and learns from minibatches sampled from the buffer.
+
+	'train_parallel(...)' is a variant of 'train(...)' where several actor processes generate the games
+	and the calling process learns from them.
+
+The classes 'QPlayer' and 'TDPlayer' are the tabular players of Connect Four for boards of up to 7 rows and 8 columns.
+Their tables are bounded hash tables (see 'hashtable.py') with a fixed number of entries 'capacity'.
+
+The class 'SolverPlayer' plays a winning action whenever a proof-number search (see 'pnsearch.py') proves one.
 '''
 
 
 import random
+import queue
 import torch
 import torch.nn as nn
+import torch.multiprocessing as multiprocessing
 
 from math import inf as infinity
 from statistics import mean
 from copy import copy, deepcopy
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
 
-from neuralnetwork import FNN
+from neuralnetwork import FNN, net_state_dict
+from replaybuffer import ReplayBuffer
+from hashtable import HashTable, board_key, pair_key
+from pnsearch import ProofNumberSearch
+from profiling import NO_PHASE
+
+
+def tactical_choice(game):
+	'''Returns an action that wins immediately, the only action that blocks an immediate win of the opponent or None'''
+
+	wins = game.winning_actions()
+	if wins:
+		return random.choice(wins)
+	blocks = game.blocking_actions()
+	if len(blocks) == 1:
+		return blocks[0]
+	return None
 
 
 class HumanPlayer:
@@ -71,9 +101,16 @@ class PrunPlayer:
 			else:
 				return -0.5
 		else:
+			# Tactical pre-check: an immediate win ends the search and actions that allow the
+			# opponent to win immediately are skipped if the search would see that win anyway
+			if game.winning_actions():
+				return 1 if game.player == 1 else -1
+			actions = game.safe_actions() if depth >= 2 else game.legal_actions()
+			if not actions:
+				return -1 if game.player == 1 else 1
 			if game.player == 1:
 				r = -infinity
-				for action in game.legal_actions():
+				for action in actions:
 					game.execute(action)
 					e = self.Phi(game, alpha, beta, depth-1)
 					r = max(r,e)
@@ -85,7 +122,7 @@ class PrunPlayer:
 				return r
 			else:
 				r = infinity
-				for action in game.legal_actions():
+				for action in actions:
 					game.execute(action)
 					e = self.Phi(game, alpha, beta, depth-1)
 					r = min(r,e)
@@ -97,11 +134,15 @@ class PrunPlayer:
 				return r
 	
 	def choice(self, game):
+		wins = game.winning_actions()
+		if wins:
+			return random.choice(wins)
+
 		alpha, beta = -infinity, infinity
 		if game.player == 1:
 			r = -infinity
 			best_action = None
-			legal_actions = game.legal_actions()
+			legal_actions = (game.safe_actions() if self.depth >= 2 else []) or game.legal_actions()
 			random.shuffle(legal_actions)
 			for action in legal_actions:
 				game.execute(action)
@@ -118,7 +159,7 @@ class PrunPlayer:
 		else:
 			r = infinity
 			best_action = None
-			legal_actions = game.legal_actions()
+			legal_actions = (game.safe_actions() if self.depth >= 2 else []) or game.legal_actions()
 			random.shuffle(legal_actions)
 			for action in legal_actions:
 				game.execute(action)
@@ -134,32 +175,285 @@ class PrunPlayer:
 			return best_action
 
 
+class SolverPlayer:
+	'''Plays a proven winning action of a proof-number search and otherwise the action of a PrunPlayer
+
+		The transposition table of the search is cleared at the start of every game and whenever it
+		holds more than 'table_capacity' positions.
+	'''
+
+	def __init__(self, node_budget, depth, table_capacity=2**18):
+		self.name = 'PNS' + str(depth)
+		self.search = ProofNumberSearch(node_budget)
+		self.fallback = PrunPlayer(depth)
+		self.table_capacity = table_capacity
+		self.time = 0
+
+	def choice(self, game):
+		if game.time < self.time or len(self.search.table) > self.table_capacity:
+			self.search.table.clear()
+		self.time = game.time
+		result, action = self.search.search(game)
+		if result == 'proven':
+			return action
+		return self.fallback.choice(game)
+
+
 class ChainPlayer:
-	def __init__(self, type):
-		self.name = 'O.Chain' if type == 'offensive' else 'D.Chain'
+	def __init__(self, type, tactical=False):
+		self.name = ('O.Chain' if type == 'offensive' else 'D.Chain') + ('(T)' if tactical else '')
 		self.sign = 1 if type == 'offensive' else -1
+		self.tactical = tactical
 
 	def choice(self, game):
+		if self.tactical:
+			action = tactical_choice(game)
+			if action is not None:
+				return action
+
 		action = None
 		max_count = 0
 		legal_actions = game.legal_actions()
 		random.shuffle(legal_actions)
 		for column in legal_actions:
-			for i in range(game.num_of_rows-1,-1,-1):
-				if game.board[i][column] == 0:
-					row = i
-					break
+			row = game.landing_row(column)
 			lines = [1,2,3,4]
 			random.shuffle(lines)
 			for line in lines:
-				c = game.counter(game.player*self.sign, row, column, line)
+				c = game.chain_length(game.player*self.sign, row, column, line)
 				if c > max_count:
 					max_count = c
 					action = column
 		return action
 
 
+class QPlayer:
+	def __init__(self, alpha, epsilon, gamma, capacity, eviction='least_visited'):
+		self.name = 'Q'
+		self.alpha = alpha
+		self.epsilon = epsilon
+		self.gamma = gamma
+		self.Q1 = HashTable(capacity, eviction)
+		self.Q2 = HashTable(capacity, eviction)
+
+	def key(self, state, action):
+		return pair_key(state, action)
+
+	def get_Q1(self, state, action):
+		Q1 = self.Q1.get(self.key(state, action))
+		if Q1 is None:
+			Q1 = random.uniform(-1,1)*0.2
+			self.Q1[self.key(state, action)] = Q1
+		return Q1
+
+	def get_Q2(self, state, action):
+		Q2 = self.Q2.get(self.key(state, action))
+		if Q2 is None:
+			Q2 = random.uniform(-1,1)*0.2
+			self.Q2[self.key(state, action)] = Q2
+		return Q2
+
+	def max_Q1(self, game):
+		max_Q1 = -infinity
+		max_action = None
+		state = board_key(game.board)
+		for action in game.legal_actions():
+			Q1 = self.get_Q1(state, action)
+			if Q1 > max_Q1:
+				max_Q1 = Q1
+				max_action = action
+		return max_Q1, max_action
+
+	def min_Q2(self, game):
+		min_Q2 = infinity
+		min_action = None
+		state = board_key(game.board)
+		for action in game.legal_actions():
+			Q2 = self.get_Q2(state, action)
+			if Q2 < min_Q2:
+				min_Q2 = Q2
+				min_action = action
+		return min_Q2, min_action
+
+	def choice(self, game):
+		if random.uniform(0,1) < self.epsilon:
+			return random.choice(game.legal_actions())
+		else:
+			if game.player == 1:
+				return self.max_Q1(game)[1]
+			else:
+				return self.min_Q2(game)[1]
+
+	def train_single_game(self, game):
+		game.reset()
+
+		state, action = board_key(game.board), self.choice(game)
+		game.execute(action)
+		
+		opponent_state, opponent_action = board_key(game.board), self.choice(game)
+		game.execute(opponent_action)
+
+		while not game.terminated:
+			if game.player == 1:
+				self.Q1[self.key(state,action)] = self.get_Q1(state,action) + self.alpha*(0 + self.gamma*self.max_Q1(game)[0] - self.get_Q1(state,action))
+			else:
+				self.Q2[self.key(state,action)] = self.get_Q2(state,action) + self.alpha*(0 + self.gamma*self.min_Q2(game)[0] - self.get_Q2(state,action))
+			
+			next_state = board_key(game.board)
+			next_action = self.choice(game)
+			game.execute(next_action)
+			
+			state, action = opponent_state, opponent_action
+			opponent_state, opponent_action = next_state, next_action
+
+		if game.winner == 'x':
+			reward = 1
+		elif game.winner == 'o':
+			reward = -1
+		else:
+			reward = 0
+
+		if game.player == 1:
+			self.Q1[self.key(state,action)] = self.get_Q1(state,action) + self.alpha*(reward - self.get_Q1(state,action))
+			self.Q2[self.key(opponent_state,opponent_action)] = self.get_Q2(opponent_state,opponent_action) + self.alpha*(reward - self.get_Q2(opponent_state,opponent_action))
+		else:
+			self.Q2[self.key(state,action)] = self.get_Q2(state,action) + self.alpha*(reward - self.get_Q2(state,action))
+			self.Q1[self.key(opponent_state,opponent_action)] = self.get_Q1(opponent_state,opponent_action) + self.alpha*(reward - self.get_Q1(opponent_state,opponent_action))
+
+	def train(self, game, number_of_games, render):
+		if render:
+			print('Start training of', self.name, ' with the following parameters:')
+			print('Number of games:', number_of_games, ' | alpha:', self.alpha, ' | epsilon:', self.epsilon, ' | gamma:', self.gamma)
+			print('Capacity of Q1 and Q2:', self.Q1.capacity, ' | eviction:', self.Q1.eviction)
+			print()
+			print(0, 'games completed')
+		for i in range(1, number_of_games + 1):
+			self.train_single_game(game)
+			if i % (number_of_games/10) == 0:
+				if render:
+					print(i, 'games completed.', 'Entries of Q1, Q2:', len(self.Q1), len(self.Q2), ' | evictions:', self.Q1.evictions + self.Q2.evictions)
+		if render:
+			print()
+
+
+class TDPlayer:
+	def __init__(self, alpha, epsilon, gamma, lanbda, capacity, eviction='least_visited'):
+		self.name = 'TD'
+		self.alpha = alpha
+		self.epsilon = epsilon
+		self.gamma = gamma
+		self.lanbda = lanbda
+		self.V = HashTable(capacity, eviction)
+
+	def get_V(self, state):
+		V = self.V.get(state)
+		if V is None:
+			V = random.uniform(-1,1)*0.2
+			self.V[state] = V
+		return V
+
+	def choice(self, game):
+		if random.uniform(0,1) < self.epsilon:
+			return random.choice(game.legal_actions())
+		else:
+			if game.player == 1:
+				max_V = -infinity
+				best_action = None
+				for action in game.legal_actions():
+					game.execute(action)
+					V = self.get_V(board_key(game.board))
+					if V > max_V:
+						max_V = V
+						best_action = action
+					game.undo(action)
+				return best_action
+			else:
+				min_V = infinity
+				best_action = None
+				for action in game.legal_actions():
+					game.execute(action)
+					V = self.get_V(board_key(game.board))
+					if V < min_V:
+						min_V = V
+						best_action = action
+					game.undo(action)
+				return best_action
+
+	def train_single_game(self, game):
+		game.reset()
+
+		state, action = board_key(game.board), self.choice(game)
+		game.execute(action)
+
+		next_state = board_key(game.board)
+
+		z = {}
+
+		while not game.terminated:
+			if z.get(state) == None:
+				z[state] = 1
+			else:
+				z[state] +=1
+
+			for x, eligibility in z.items():
+				self.V[x] = self.get_V(x) + self.alpha*(0 + self.gamma*self.get_V(next_state) - self.get_V(state))*eligibility
+				z[x] *= self.gamma*self.lanbda
+
+			action = self.choice(game)
+			game.execute(action)
+			next_next_state = board_key(game.board)
+
+			state = next_state
+			next_state = next_next_state
+
+		if z.get(state) == None:
+			z[state] = 1
+		else:
+			z[state] +=1
+
+		if game.winner == 'x':
+			reward = 1
+		elif game.winner == 'o':
+			reward = -1
+		else:
+			reward = 0
+
+		for x, eligibility in z.items():
+			self.V[x] = self.get_V(x) + self.alpha*(reward - self.get_V(state))*eligibility
+			z[x] *= self.gamma*self.lanbda
+
+		self.V[next_state] = reward
+
+	def train(self, game, number_of_games, render):
+		if render:
+			print('Start training of', self.name, ' with the following parameters:')
+			print('Number of games:', number_of_games, ' | alpha:', self.alpha, ' | epsilon:', self.epsilon, ' | gamma:', self.gamma)
+			print('Capacity of V:', self.V.capacity, ' | eviction:', self.V.eviction)
+			print()
+			print(0, 'games completed')
+		for i in range(1, number_of_games + 1):
+			self.train_single_game(game)
+			if i % (number_of_games/10) == 0:
+				if render:
+					print(i, 'games completed.', 'Entries of V:', len(self.V), ' | evictions:', self.V.evictions)
+		if render:
+			print()
+
+
 class DeepPlayer:
+	# Index permutations of the encoded state, see 'symmetries(self)'
+	permutations = None
+
+	# Optional 'ValueCache' (see 'valuecache.py') and the version of the weights that every update increases
+	cache = None
+	version = 0
+
+	# If True, immediate wins and the only block of an immediate win of the opponent are played without the network
+	tactical = False
+
+	# Optional 'Profiler' (see 'profiling.py') of the training
+	profiler = None
+
 	def __init__(self, alpha, epsilon, gamma, num_central_layers, central_layer_dim):
 		self.name = 'Deep'
 		self.alpha = alpha
@@ -191,18 +485,52 @@ class DeepPlayer:
 			array += [0,1]
 		return torch.tensor(array, dtype=torch.float32)
 
+	def encode(self, game):
+		'''Returns the encoded state of 'game', it is copied from the game if the game tracks its features'''
+
+		if getattr(game, 'features', None) is not None:
+			return torch.frombuffer(game.features, dtype=torch.float32).clone()
+		return self.preprocess(game.board, game.player)
+
+	def position_key(self, game):
+		'''Returns the key of the position of 'game' from its bitboards (see 'board_key' in 'hashtable.py')
+
+			The player to move follows from the number of discs, so the key is unique.
+		'''
+
+		return game.mask + game.bits[0] + game.bottom_mask
+
+	@torch.no_grad()
+	def value(self, game):
+		'''Returns the value of the position of 'game' according to the network
+
+			If the player has a cache, values are taken from it if they were computed with the current weights.
+		'''
+
+		if self.cache is None:
+			return self.net(self.encode(game)).item()
+		key = self.position_key(game)
+		V = self.cache.get(key, self.version)
+		if V is None:
+			V = self.net(self.encode(game)).item()
+			self.cache.put(key, self.version, V)
+		return V
+
 	@torch.no_grad()
 	def choice(self, game):
 		if random.uniform(0,1) < self.epsilon:
 			return random.choice(game.legal_actions())
 		else:
+			if self.tactical:
+				action = tactical_choice(game)
+				if action is not None:
+					return action
 			if game.player == 1:
 				max_V = -infinity
 				max_action = None
 				for action in game.legal_actions():
 					game.execute(action)
-					x = self.preprocess(game.board, game.player)
-					V = self.net(x).item()
+					V = self.value(game)
 					if V > max_V:
 						max_V = V
 						max_action = copy(action)
@@ -213,38 +541,162 @@ class DeepPlayer:
 				min_action = None
 				for action in game.legal_actions():
 					game.execute(action)
-					x = self.preprocess(game.board,game.player)
-					V = self.net(x).item()
+					V = self.value(game)
 					if V < min_V:
 						min_V = V
 						min_action = copy(action)
 					game.undo(action)
 				return min_action
 
-	def update(self, board, player, T, t, reward):
+	@torch.no_grad()
+	def batch_choice(self, games):
+		'''Returns the choices of actions for a list of games
+
+			The successors of all games that are not in the cache are evaluated in a single
+			forward pass of the network.
+		'''
+
+		actions = [None]*len(games)
+		candidates = []
+		V = []
+		pending = []
+		x = []
+		for k, game in enumerate(games):
+			tactical_action = tactical_choice(game) if self.tactical else None
+			if random.uniform(0,1) < self.epsilon:
+				actions[k] = random.choice(game.legal_actions())
+			elif tactical_action is not None:
+				actions[k] = tactical_action
+			else:
+				for action in game.legal_actions():
+					game.execute(action)
+					key = None if self.cache is None else self.position_key(game)
+					v = None if key is None else self.cache.get(key, self.version)
+					if v is None:
+						x.append(self.encode(game))
+						pending.append((len(V), key))
+					game.undo(action)
+					candidates.append((k, action))
+					V.append(v)
+
+		if x:
+			for (i, key), v in zip(pending, self.net(torch.stack(x)).view(-1).tolist()):
+				V[i] = v
+				if key is not None:
+					self.cache.put(key, self.version, v)
+
+		if candidates:
+			best_V = [-infinity]*len(games)
+			for (k, action), v in zip(candidates, V):
+				# Player x maximizes V and player o minimizes V
+				v *= games[k].player
+				if v > best_V[k]:
+					best_V[k] = v
+					actions[k] = action
+		return actions
+
+	def symmetries(self):
+		'''Returns the index permutations of the encoded state that belong to the symmetries of the board
+
+			A Connect Four board has two symmetries: the identity and the reflection at the central column.
+			The encoded state x of a symmetric board is x[permutation].
+		'''
+
+		if self.permutations is None:
+			identity = list(range(7*6*3 + 2))
+			reflection = []
+			for i in range(6):
+				for j in range(7):
+					reflection += [(i*7 + 6 - j)*3 + k for k in range(3)]
+			reflection += [7*6*3, 7*6*3 + 1]
+			self.permutations = torch.tensor([identity, reflection])
+		return self.permutations
+
+	def symmetric_variants(self, x, target):
+		'''Expands a batch of encoded states and their targets by the symmetric variants of the states'''
+
+		permutations = self.symmetries()
+		x = x[:, permutations].reshape(-1, x.shape[-1])
+		target = target.repeat_interleave(len(permutations), dim=0)
+		return x, target
+
+	def phase(self, name):
+		'''Returns the timer of the phase 'name' of the profiler or a context manager that does nothing'''
+
+		return NO_PHASE if self.profiler is None else self.profiler.phase(name)
+
+	def zero_grad(self):
+		'''Resets the gradients before an update, a player without optimizer can only play'''
+
+		if self.optimizer is None:
+			raise RuntimeError('the network of ' + self.name + ' cannot be trained, the player is only for playing')
+		self.optimizer.zero_grad()
+
+	def update(self, x, T, t, reward, augment=False):
+		'''Moves the value of the encoded state x (see 'encode') at time t of a game of length T towards its target'''
+
 		target = torch.tensor([0.5*(self.gamma**(T-t))*reward + 0.5], dtype=torch.float32)
 		
-		x = self.preprocess(board, player)
+		if augment:
+			with self.phase('encoding'):
+				x, target = self.symmetric_variants(x.view(1, -1), target.view(1, 1))
+
+		self.zero_grad()
+		with self.phase('forward'):
+			loss = self.loss_fn(target, self.net(x))
+		with self.phase('backward'):
+			loss.backward()
+		with self.phase('optimizer step'):
+			self.optimizer.step()
+		self.version += 1
+		
+		return loss
 
-		self.optimizer.zero_grad()
+	def update_batch(self, x, target):
+		self.zero_grad()
 		loss = self.loss_fn(target, self.net(x))
 		loss.backward()
 		self.optimizer.step()
-		
+		self.version += 1
+
 		return loss
 
-	def train_single_game(self, game):
+	def self_play(self, game):
+		'''Plays a game against itself and returns the encoded states, the players, the final time and the reward'''
+
+		game.reset()
+		x = [self.encode(game)]
+		players = [game.player]
+		while not game.terminated:
+			action = self.choice(game)
+			game.execute(action)
+			x.append(self.encode(game))
+			players.append(game.player)
+
+		if game.winner == 'x':
+			reward = 1
+		elif game.winner == 'o':
+			reward = -1
+		else:
+			reward = 0
+
+		return torch.stack(x), players, game.time, reward
+
+	def train_single_game(self, game, augment=False):
 		losslist = []
 
 		game.reset()
 
 		episode = []
-		episode.append([copy(game.board), game.player, game.time])
+		with self.phase('encoding'):
+			episode.append([self.encode(game), game.time])
 		
 		while not game.terminated:
-			action = self.choice(game)
-			game.execute(action)
-			episode.append([copy(game.board), game.player, game.time])
+			with self.phase('self-play'):
+				action = self.choice(game)
+				game.execute(action)
+			with self.phase('encoding'):
+				episode.append([self.encode(game), game.time])
 
 		T = game.time
 
@@ -255,19 +707,96 @@ class DeepPlayer:
 		else:
 			reward = 0
 
-		for board, player, t in episode:
-			loss = self.update(board, player, T, t, reward)
+		for x, t in episode:
+			loss = self.update(x, T, t, reward, augment)
 			losslist.append(loss.item())
 		
 		return losslist
 
-	def train(self, game, number_of_games, decrease_parameters, render):
+	def update_from_buffer(self, replay_buffer, batch_size, prioritized):
+		indices, x, players, target, weights = replay_buffer.sample(batch_size, prioritized)
+
+		self.zero_grad()
+		with self.phase('forward'):
+			error = self.net(x) - target
+			loss = (weights.view(-1, 1)*error**2).mean()
+		with self.phase('backward'):
+			loss.backward()
+		with self.phase('optimizer step'):
+			self.optimizer.step()
+		self.version += 1
+
+		if prioritized:
+			replay_buffer.update_priorities(indices, error)
+
+		return loss
+
+	def train_single_game_with_replay(self, game, replay_buffer, replay_parameters, augment=False):
+		with self.phase('self-play'):
+			x, players, T, reward = self.self_play(game)
+		target = torch.tensor([0.5*(self.gamma**(T-t))*reward + 0.5 for t in range(T+1)], dtype=torch.float32).view(-1, 1)
+		players = torch.tensor(players, dtype=torch.int8)
+		if augment:
+			x, target = self.symmetric_variants(x, target)
+			players = players.repeat_interleave(len(self.symmetries()))
+		replay_buffer.add(x, players, target)
+
+		losslist = []
+		for k in range(replay_parameters['updates_per_game']):
+			loss = self.update_from_buffer(replay_buffer, replay_parameters['batch_size'], replay_parameters['prioritized'])
+			losslist.append(loss.item())
+
+		return losslist
+
+	def save_checkpoint(self, dir_path, games_played, info):
+		'''Saves the player in 'dir_path' as a checkpoint
+
+			The file 'deepplayer_weights.pt' contains the weights of the network and a header with the
+			architecture, the hyperparameters, the number of games played and the dictionary 'info'.
+			The file 'deepplayer_optimizer.pt' contains what is only needed to resume the training:
+			the state of the optimizer and the current epsilon.
+		'''
+
+		header = dict(info)
+		header.update({
+			'alpha' : self.alpha,
+			'gamma' : self.gamma,
+			'num_central_layers' : len(self.net.central_layers),
+			'central_layer_dim' : self.net.first_layer.out_features,
+			'games_played' : games_played
+		})
+		torch.save({'info': header, 'state_dict': net_state_dict(self.net)}, dir_path + '/deepplayer_weights.pt')
+		torch.save({'optimizer': self.optimizer.state_dict(), 'epsilon': self.epsilon}, dir_path + '/deepplayer_optimizer.pt')
+
+	def train(self, game, number_of_games, decrease_parameters, render, replay_parameters=None, augment=False, checkpoint_parameters=None):
+		'''Trains the player until it played 'number_of_games' games against itself
+
+			If 'augment' is True, every state is learned together with its symmetric variants.
+
+			If 'replay_parameters' is given and its entry 'use_replay' is True, the games are stored in a
+			replay buffer of size 'capacity' and after every game 'updates_per_game' minibatches of size
+			'batch_size' are sampled from it, uniformly or, if 'prioritized' is True, by priority.
+
+			If 'checkpoint_parameters' is given, a checkpoint is saved in its 'dir_path' every
+			'checkpoint_after' games, see 'save_checkpoint'. A training that is resumed from a
+			checkpoint starts after the 'games_played' games of the checkpoint. The replay buffer
+			is not part of a checkpoint.
+
+			If the player has a 'profiler' (see 'profiling.py'), every game is reported to it.
+		'''
+
 		decrease_alpha = decrease_parameters['decrease_alpha']
 		alpha_decrease_factor = decrease_parameters['alpha_decrease_factor']
 		decrease_epsilon = decrease_parameters['decrease_epsilon']
 		epsilon_decrease_factor = decrease_parameters['epsilon_decrease_factor']
 		decrease_after = decrease_parameters['decrease_after']
 
+		games_played = 0 if checkpoint_parameters is None else checkpoint_parameters['games_played']
+
+		use_replay = replay_parameters is not None and replay_parameters['use_replay']
+		if use_replay:
+			replay_buffer = ReplayBuffer(replay_parameters['capacity'], self.net.first_layer.in_features)
+
 		losslist = []
 		alpha_render = 0
 
@@ -276,10 +805,20 @@ class DeepPlayer:
 			print('Number of games:', number_of_games)
 			print('Alpha:', self.alpha, ' | decrease alpha:', decrease_alpha, ' | alpha decrease factor', alpha_decrease_factor)
 			print('Epsilon:', self.epsilon, ' | decrease epsilon:', decrease_epsilon, ' | epsilon decrease factor', epsilon_decrease_factor)
+			print('Augment:', augment)
+			if use_replay:
+				print('Replay capacity:', replay_parameters['capacity'], ' | batch size:', replay_parameters['batch_size'], ' | updates per game:', replay_parameters['updates_per_game'], ' | prioritized:', replay_parameters['prioritized'])
 			print()
-			print(0, 'games completed')
-		for i in range(1, number_of_games + 1):
-			loss = self.train_single_game(game)
+			print(games_played, 'games completed')
+		for i in range(games_played + 1, number_of_games + 1):
+			if self.profiler is not None:
+				self.profiler.begin_game()
+			if use_replay:
+				loss = self.train_single_game_with_replay(game, replay_buffer, replay_parameters, augment)
+			else:
+				loss = self.train_single_game(game, augment)
+			if self.profiler is not None:
+				self.profiler.end_game()
 			losslist.append(mean(loss))
 			if i % decrease_after == 0:
 				if decrease_alpha:
@@ -290,7 +829,184 @@ class DeepPlayer:
 					self.epsilon *= epsilon_decrease_factor
 				if render:
 					print(i, 'games completed.', 'New alpha:', round(alpha_render,3), 'New epsilon:', round(self.epsilon,3))
+			if checkpoint_parameters is not None and i % checkpoint_parameters['checkpoint_after'] == 0:
+				self.save_checkpoint(checkpoint_parameters['dir_path'], i, checkpoint_parameters['info'])
 		if render:
 			print()
 
-		return losslist
\ No newline at end of file
+		return losslist
+
+	def train_supervised(self, loader, number_of_epochs, render):
+		'''Trains the network on the minibatches of 'loader' for 'number_of_epochs' epochs
+
+			'loader' yields encoded states and their targets, for example the loader of a dataset
+			of labelled positions (see 'dataset_loader' in 'dataset.py').
+		'''
+
+		losslist = []
+		if render:
+			print('Start supervised training of', self.name, 'for', number_of_epochs, 'epochs')
+		for epoch in range(1, number_of_epochs + 1):
+			epoch_loss = []
+			for x, target in loader:
+				epoch_loss.append(self.update_batch(x, target).item())
+			losslist += epoch_loss
+			if render:
+				print('Epoch', epoch, 'completed.', 'Mean loss:', round(mean(epoch_loss), 5))
+		if render:
+			print()
+
+		return losslist
+
+	def self_play_actor(self, game, weights, version, lock, epsilon, slots, free_slots, episodes, stop):
+		'''Plays games against itself and passes them to the learner
+
+			This function runs in an actor process of 'train_parallel'. The states of a game are written
+			into a free slot of the shared memory tensor 'slots' and the index of the slot is put into
+			the queue 'episodes'. Whenever the learner publishes new weights, they are copied into the
+			own network before the next game.
+		'''
+
+		random.seed()
+		torch.set_num_threads(1)
+		local_version = -1
+
+		while not stop.is_set():
+			if version.value != local_version:
+				with lock:
+					local_version = version.value
+					vector_to_parameters(weights.clone(), self.net.parameters())
+					self.version += 1
+			self.epsilon = epsilon.value
+
+			x, players, T, reward = self.self_play(game)
+
+			while not stop.is_set():
+				try:
+					slot = free_slots.get(timeout=0.1)
+					break
+				except queue.Empty:
+					pass
+			else:
+				break
+			slots[slot, :T+1] = x
+			episodes.put((slot, T, reward))
+
+	def next_episode(self, episodes, actors):
+		'''Returns the next game of the queue 'episodes' of 'train_parallel'
+
+			Raises a RuntimeError if the queue is empty and all actor processes have exited, for example
+			because of an exception, instead of waiting forever.
+		'''
+
+		while True:
+			try:
+				return episodes.get(timeout=1)
+			except queue.Empty:
+				if not any(actor.is_alive() for actor in actors):
+					raise RuntimeError('all actor processes have exited, exit codes: ' + str([actor.exitcode for actor in actors]))
+
+	def train_parallel(self, game, number_of_games, decrease_parameters, parallel_parameters, render, augment=False, checkpoint_parameters=None):
+		'''Same as 'train', but the games are played by actor processes
+
+			'number_of_actors' processes play games with a copy of the network and pass them through
+			shared memory. This process takes 'batch_size' games at a time from the queue and does one update on all
+			their states. Every 'sync_after' updates the new weights are published to the actors.
+			The processes are forked, so this requires a Unix system.
+		'''
+
+		games_played = 0 if checkpoint_parameters is None else checkpoint_parameters['games_played']
+
+		decrease_alpha = decrease_parameters['decrease_alpha']
+		alpha_decrease_factor = decrease_parameters['alpha_decrease_factor']
+		decrease_epsilon = decrease_parameters['decrease_epsilon']
+		epsilon_decrease_factor = decrease_parameters['epsilon_decrease_factor']
+		decrease_after = decrease_parameters['decrease_after']
+
+		number_of_actors = parallel_parameters['number_of_actors']
+		batch_size = parallel_parameters['batch_size']
+		sync_after = parallel_parameters['sync_after']
+
+		context = multiprocessing.get_context('fork')
+		weights = parameters_to_vector(self.net.parameters()).detach().clone().share_memory_()
+		version = context.Value('i', 0)
+		lock = context.Lock()
+		epsilon = context.Value('d', self.epsilon)
+		stop = context.Event()
+
+		# Every slot holds the states of one game, the queues pass the indices of the slots
+		number_of_slots = 4*batch_size
+		slots = torch.zeros(number_of_slots, game.max_time + 1, self.net.first_layer.in_features).share_memory_()
+		free_slots = context.Queue()
+		for slot in range(number_of_slots):
+			free_slots.put(slot)
+		episodes = context.Queue()
+
+		actors = []
+		for k in range(number_of_actors):
+			actor = context.Process(target=self.self_play_actor, args=(game, weights, version, lock, epsilon, slots, free_slots, episodes, stop), daemon=True)
+			actor.start()
+			actors.append(actor)
+
+		losslist = []
+		alpha_render = 0
+
+		if render:
+			print('Start training of', self.name, ' with', number_of_actors, 'actors and the following parameters:')
+			print('Number of games:', number_of_games, ' | batch size:', batch_size, ' | sync after:', sync_after, 'updates')
+			print('Alpha:', self.alpha, ' | decrease alpha:', decrease_alpha, ' | alpha decrease factor', alpha_decrease_factor)
+			print('Epsilon:', self.epsilon, ' | decrease epsilon:', decrease_epsilon, ' | epsilon decrease factor', epsilon_decrease_factor)
+			print()
+			print(games_played, 'games completed')
+
+		i = games_played
+		number_of_updates = 0
+		while i < number_of_games:
+			batch = [self.next_episode(episodes, actors) for k in range(min(batch_size, number_of_games - i))]
+
+			x = torch.cat([slots[slot, :T+1] for slot, T, reward in batch])
+			target = []
+			for slot, T, reward in batch:
+				target += [0.5*(self.gamma**(T-t))*reward + 0.5 for t in range(T+1)]
+				free_slots.put(slot)
+			target = torch.tensor(target, dtype=torch.float32).view(-1, 1)
+			if augment:
+				x, target = self.symmetric_variants(x, target)
+
+			loss = self.update_batch(x, target).item()
+			number_of_updates += 1
+
+			if number_of_updates % sync_after == 0:
+				with lock:
+					weights.copy_(parameters_to_vector(self.net.parameters()).detach())
+					version.value += 1
+
+			for k in range(len(batch)):
+				i += 1
+				losslist.append(loss)
+				if i % decrease_after == 0:
+					if decrease_alpha:
+						for g in self.optimizer.param_groups:
+							g['lr'] *= alpha_decrease_factor
+							alpha_render = g['lr']
+					if decrease_epsilon:
+						self.epsilon *= epsilon_decrease_factor
+						epsilon.value = self.epsilon
+					if render:
+						print(i, 'games completed.', 'New alpha:', round(alpha_render,3), 'New epsilon:', round(self.epsilon,3))
+				if checkpoint_parameters is not None and i % checkpoint_parameters['checkpoint_after'] == 0:
+					self.save_checkpoint(checkpoint_parameters['dir_path'], i, checkpoint_parameters['info'])
+
+		stop.set()
+		while any(actor.is_alive() for actor in actors):
+			try:
+				episodes.get(timeout=0.1)
+			except queue.Empty:
+				pass
+		for actor in actors:
+			actor.join()
+
+		if render:
+			print()
+
+		return losslist
@@ -0,0 +1,164 @@
+'''Proof-number search
+
+This file contains a solver that proves or disproves that a player of a 'ConnectFour' position wins. Comments:
+
+	The player that tries to win is the attacker, by default the player to move. A position is proven
+	if the attacker wins against every defence and disproven if the defender can reach a draw or a win.
+	The search tree is built with 'execute' and 'undo' of the game. In every step the most-proving
+	leaf is expanded, so the search follows forced lines instead of searching to a uniform depth.
+
+	New leaves are evaluated with the tactical functions of the game: an immediate win decides the leaf
+	and moves that allow the opponent to win immediately are not part of the tree.
+
+	Solved positions are stored in the transposition table 'table', which can be shared between searches.
+	The root is never looked up in the table but always expanded, so the move of a proven root is a winning move.
+	A search stops after 'node_budget' nodes were created.
+
+The most important function is 'search(self, game, attacker=None)':
+
+	It returns 'proven', 'disproven' or 'unknown' and a move. For a proven position the move is a
+	winning move, otherwise it is the most promising move found.
+
+The function 'solve(game, node_budget)' combines two searches into the value of the position
+(1 if x wins, -1 if o wins, 0 for a draw) or None if the budget was not enough.
+'''
+
+
+from math import inf as infinity
+
+
+class Node:
+	__slots__ = ['action', 'parent', 'children', 'is_or', 'pn', 'dn']
+
+	def __init__(self, action, parent, is_or):
+		self.action = action
+		self.parent = parent
+		self.children = None
+		self.is_or = is_or
+		self.pn = 1
+		self.dn = 1
+
+
+class ProofNumberSearch:
+	def __init__(self, node_budget, table=None):
+		self.node_budget = node_budget
+		self.table = {} if table is None else table
+		self.number_of_nodes = 0
+
+	def key(self, game, attacker):
+		return (game.mask, game.bits[0], attacker)
+
+	def evaluate(self, game, node, attacker, lookup=True):
+		'''Sets the proof and disproof number of a new leaf, with 'lookup=False' the table is not used'''
+
+		self.number_of_nodes += 1
+		if game.terminated:
+			won = game.winner == ('x' if attacker == 1 else 'o')
+			node.pn, node.dn = (0, infinity) if won else (infinity, 0)
+			return
+
+		solved = self.table.get(self.key(game, attacker)) if lookup else None
+		if solved is not None:
+			node.pn, node.dn = (0, infinity) if solved else (infinity, 0)
+			return
+
+		if game.winning_actions():
+			# The player to move wins immediately
+			node.pn, node.dn = (0, infinity) if node.is_or else (infinity, 0)
+			return
+
+		moves = game.safe_actions()
+		if not moves:
+			# Every move allows the opponent to win immediately
+			node.pn, node.dn = (infinity, 0) if node.is_or else (0, infinity)
+			return
+
+		node.pn, node.dn = (1, len(moves)) if node.is_or else (len(moves), 1)
+
+	def expand(self, game, node, attacker):
+		node.children = []
+		for action in game.safe_actions():
+			game.execute(action)
+			child = Node(action, node, game.player == attacker)
+			self.evaluate(game, child, attacker)
+			game.undo(action)
+			node.children.append(child)
+		self.set_numbers(node)
+
+	def set_numbers(self, node):
+		if node.is_or:
+			node.pn = min(child.pn for child in node.children)
+			node.dn = sum(child.dn for child in node.children)
+		else:
+			node.pn = sum(child.pn for child in node.children)
+			node.dn = min(child.dn for child in node.children)
+
+	def search(self, game, attacker=None):
+		'''Returns 'proven', 'disproven' or 'unknown' and a move of the player to move'''
+
+		if attacker is None:
+			attacker = game.player
+		self.number_of_nodes = 0
+		root = Node(None, None, game.player == attacker)
+		self.evaluate(game, root, attacker, lookup=False)
+
+		while root.pn != 0 and root.dn != 0 and self.number_of_nodes < self.node_budget:
+			# Select the most-proving leaf
+			node = root
+			path = []
+			while node.children is not None:
+				if node.is_or:
+					node = min(node.children, key=lambda child: child.pn)
+				else:
+					node = min(node.children, key=lambda child: child.dn)
+				game.execute(node.action)
+				path.append(node.action)
+
+			self.expand(game, node, attacker)
+
+			# Update the numbers of the ancestors and return to the root
+			while True:
+				if node.pn == 0 or node.dn == 0:
+					self.table[self.key(game, attacker)] = node.pn == 0
+				if node.parent is None:
+					break
+				if node.pn == 0 or node.dn == 0:
+					# The subtree of a solved node is not needed anymore
+					node.children = []
+				game.undo(path.pop())
+				node = node.parent
+				self.set_numbers(node)
+
+		if root.pn == 0:
+			result = 'proven'
+		elif root.dn == 0:
+			result = 'disproven'
+		else:
+			result = 'unknown'
+		return result, self.best_move(game, root, result)
+
+	def best_move(self, game, root, result):
+		if result == 'proven' and game.winning_actions():
+			return game.winning_actions()[0]
+		if not root.children:
+			moves = game.safe_actions() or game.legal_actions()
+			return moves[0]
+		if root.is_or:
+			return min(root.children, key=lambda child: (child.pn, -child.dn)).action
+		return min(root.children, key=lambda child: (child.dn, -child.pn)).action
+
+
+def solve(game, node_budget, table=None):
+	'''Returns the value of the position of 'game' (1 if x wins, -1 if o wins, 0 for a draw) or None'''
+
+	search = ProofNumberSearch(node_budget, table)
+	result, move = search.search(game)
+	if result == 'proven':
+		return game.player
+	if result == 'disproven':
+		result, move = search.search(game, attacker=-game.player)
+		if result == 'proven':
+			return -game.player
+		if result == 'disproven':
+			return 0
+	return None
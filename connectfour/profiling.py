@@ -0,0 +1,137 @@
+'''Profiling
+
+This file contains the class 'Profiler' that profiles a training ('train' of the 'DeepPlayer') or an
+evaluation ('evaluation' in 'tools.py'). Comments:
+
+	The games of a run are counted from 1. The games of the window 'cprofile_games' = (first game,
+	number of games) are profiled with cProfile and the games of the window 'torch_profiler_games'
+	with torch.profiler, which records the operators of the network. A window can be None.
+
+	If 'phase_timers' is True, the durations of the phases of every game are added up. In a training
+	the phases are 'self-play' (playing the game, including the evaluations of the network in 'choice'),
+	'encoding', 'forward', 'backward' and 'optimizer step' of the updates. In an evaluation the phases
+	are 'choice' of every player and 'execute'.
+
+The function 'save(self, dir_path)' writes the results into the directory of the run:
+
+	'profile.prof' (cProfile, can be read with pstats) and 'profile.txt' (the functions with the highest
+	cumulative time), 'phase_timers.pickle' and 'phase_timers.txt' (seconds, calls and share of every phase),
+	'torch_trace.json' (can be opened in chrome://tracing) and 'torch_profile.txt' (the operators with the highest CPU time).
+'''
+
+
+import cProfile
+import io
+import pickle
+import pstats
+import torch
+
+from contextlib import nullcontext
+from time import perf_counter
+
+
+NO_PHASE = nullcontext()
+
+
+class PhaseTimer:
+	'''Context manager that adds its duration to timers[name]'''
+
+	__slots__ = ['timers', 'name', 'start']
+
+	def __init__(self, timers, name):
+		self.timers = timers
+		self.name = name
+		self.start = 0
+
+	def __enter__(self):
+		self.start = perf_counter()
+
+	def __exit__(self, *args):
+		timer = self.timers[self.name]
+		timer[0] += perf_counter() - self.start
+		timer[1] += 1
+
+
+class Profiler:
+	def __init__(self, cprofile_games=None, phase_timers=True, torch_profiler_games=None):
+		self.cprofile_games = cprofile_games
+		self.phase_timers = phase_timers
+		self.torch_profiler_games = torch_profiler_games
+		self.number_of_games = 0
+		self.timers = {}
+		self.phase_timer_objects = {}
+		self.cprofile = None
+		self.cprofile_running = False
+		self.torch_profiler = None
+		self.torch_profiler_running = False
+
+	def phase(self, name):
+		'''Returns a context manager that adds its duration to the timer of the phase 'name' '''
+
+		if not self.phase_timers:
+			return NO_PHASE
+		phase_timer = self.phase_timer_objects.get(name)
+		if phase_timer is None:
+			self.timers[name] = [0.0, 0]
+			phase_timer = self.phase_timer_objects[name] = PhaseTimer(self.timers, name)
+		return phase_timer
+
+	def begin_game(self):
+		self.number_of_games += 1
+		if self.cprofile_games is not None and self.number_of_games == self.cprofile_games[0]:
+			self.cprofile = cProfile.Profile()
+			self.cprofile.enable()
+			self.cprofile_running = True
+		if self.torch_profiler_games is not None and self.number_of_games == self.torch_profiler_games[0]:
+			self.torch_profiler = torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU])
+			self.torch_profiler.start()
+			self.torch_profiler_running = True
+
+	def end_game(self):
+		if self.cprofile_running and self.number_of_games == sum(self.cprofile_games) - 1:
+			self.cprofile.disable()
+			self.cprofile_running = False
+		if self.torch_profiler_running and self.number_of_games == sum(self.torch_profiler_games) - 1:
+			self.torch_profiler.stop()
+			self.torch_profiler_running = False
+
+	def stop(self):
+		'''Stops the profilers whose windows did not end before the end of the run'''
+
+		if self.cprofile_running:
+			self.cprofile.disable()
+			self.cprofile_running = False
+		if self.torch_profiler_running:
+			self.torch_profiler.stop()
+			self.torch_profiler_running = False
+
+	def phase_report(self):
+		'''Returns the total seconds, the number of calls and the share of the total time of every phase'''
+
+		total = sum(seconds for seconds, calls in self.timers.values())
+		return {name: {'seconds': seconds, 'calls': calls, 'share': seconds/total if total > 0 else 0} for name, (seconds, calls) in self.timers.items()}
+
+	def save(self, dir_path):
+		self.stop()
+
+		if self.cprofile is not None:
+			self.cprofile.dump_stats(dir_path + '/profile.prof')
+			stream = io.StringIO()
+			pstats.Stats(self.cprofile, stream=stream).sort_stats('cumulative').print_stats(30)
+			with open(dir_path + '/profile.txt', 'w') as file:
+				file.write(stream.getvalue())
+
+		if self.timers:
+			report = self.phase_report()
+			with open(dir_path + '/phase_timers.pickle', 'wb') as file:
+				pickle.dump(report, file)
+			lines = []
+			for name, phase in sorted(report.items(), key=lambda item: -item[1]['seconds']):
+				lines.append(name + ': ' + str(round(phase['seconds'], 3)) + ' seconds | ' + str(phase['calls']) + ' calls | ' + str(round(100*phase['share'], 1)) + '%')
+			with open(dir_path + '/phase_timers.txt', 'w') as file:
+				file.write('\n'.join(lines) + '\n')
+
+		if self.torch_profiler is not None:
+			self.torch_profiler.export_chrome_trace(dir_path + '/torch_trace.json')
+			with open(dir_path + '/torch_profile.txt', 'w') as file:
+				file.write(self.torch_profiler.key_averages().table(sort_by='self_cpu_time_total', row_limit=20) + '\n')
@@ -0,0 +1,72 @@
+'''Experience replay buffer
+
+This file contains the replay buffer that can be used in the training of the class 'DeepPlayer'. Comments:
+
+	The buffer has a fixed capacity. The encoded states, the players and the targets are stored in
+	tensors that are allocated once, so the memory use does not grow during a training.
+	When the buffer is full, the oldest entries are overwritten (ring buffer).
+
+The most important function is 'sample(self, batch_size, prioritized)':
+
+	It returns a minibatch that is drawn either uniformly or with probabilities proportional to
+	the priorities of the entries. The priority of an entry is its last absolute error, which is set
+	with 'update_priorities(self, indices, errors)'. New entries get the highest priority seen so far.
+'''
+
+
+import torch
+
+
+class ReplayBuffer:
+	def __init__(self, capacity, input_dim, priority_exponent=0.6, importance_exponent=0.4):
+		self.capacity = capacity
+		self.priority_exponent = priority_exponent
+		self.importance_exponent = importance_exponent
+
+		self.states = torch.zeros(capacity, input_dim, dtype=torch.float32)
+		self.players = torch.zeros(capacity, dtype=torch.int8)
+		self.targets = torch.zeros(capacity, 1, dtype=torch.float32)
+		self.priorities = torch.zeros(capacity, dtype=torch.float32)
+
+		self.position = 0
+		self.size = 0
+		self.max_priority = 1.0
+
+	def __len__(self):
+		return self.size
+
+	def add(self, x, players, targets):
+		'''Adds a batch of encoded states x with their players and targets'''
+
+		n = len(x)
+		if n > self.capacity:
+			x, players, targets = x[-self.capacity:], players[-self.capacity:], targets[-self.capacity:]
+			n = self.capacity
+
+		indices = (self.position + torch.arange(n)) % self.capacity
+		self.states[indices] = x
+		self.players[indices] = torch.as_tensor(players, dtype=torch.int8)
+		self.targets[indices] = torch.as_tensor(targets, dtype=torch.float32).view(-1, 1)
+		self.priorities[indices] = self.max_priority
+
+		self.position = (self.position + n) % self.capacity
+		self.size = min(self.size + n, self.capacity)
+
+	def sample(self, batch_size, prioritized=False):
+		'''Returns indices, states, players, targets and importance weights of a minibatch'''
+
+		if prioritized:
+			probabilities = self.priorities[:self.size]**self.priority_exponent
+			probabilities /= probabilities.sum()
+			indices = torch.multinomial(probabilities, batch_size, replacement=True)
+			weights = (self.size*probabilities[indices])**(-self.importance_exponent)
+			weights /= weights.max()
+		else:
+			indices = torch.randint(self.size, (batch_size,))
+			weights = torch.ones(batch_size)
+		return indices, self.states[indices], self.players[indices], self.targets[indices], weights
+
+	def update_priorities(self, indices, errors):
+		priorities = errors.detach().abs().view(-1) + 1e-6
+		self.priorities[indices] = priorities
+		self.max_priority = max(self.max_priority, priorities.max().item())
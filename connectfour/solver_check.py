@@ -0,0 +1,62 @@
+'''Solver check
+
+This file can be run to check that the proven moves of the 'SolverPlayer' are winning moves.
+Below you can specify the parameters of the check.
+
+	The Solver Player plays against a Prun Player from positions after 'random_actions' random actions.
+	The Solver Player keeps its transposition table between the moves of a game. Whenever its search
+	returns 'proven', the move is played and a new search with an empty table has to prove that the
+	player who moved still wins. The number of proven moves and of wrong ones is printed and the file
+	exits with an error if a proven move is wrong.
+'''
+
+
+import sys
+import random
+
+from game import ConnectFour
+from players import SolverPlayer, PrunPlayer
+from pnsearch import ProofNumberSearch
+
+
+# Set parameters
+number_of_games = 10
+node_budget = 20000
+depth = 2
+random_actions = 4
+seed = 0
+
+random.seed(seed)
+
+
+# Play games and check the proven moves
+connectfour = ConnectFour()
+prunplayer = PrunPlayer(depth)
+proven_moves = 0
+wrong_moves = 0
+for i in range(number_of_games):
+	solverplayer = SolverPlayer(node_budget, depth)
+	solver = 1 if i % 2 == 0 else -1
+	connectfour.reset()
+	for j in range(random_actions):
+		if not connectfour.terminated:
+			connectfour.execute(random.choice(connectfour.legal_actions()))
+	while not connectfour.terminated:
+		if connectfour.player != solver:
+			connectfour.execute(prunplayer.choice(connectfour))
+			continue
+		result, action = solverplayer.search.search(connectfour)
+		if result != 'proven':
+			connectfour.execute(solverplayer.fallback.choice(connectfour))
+			continue
+		proven_moves += 1
+		connectfour.execute(action)
+		if not connectfour.terminated and ProofNumberSearch(node_budget).search(connectfour, attacker=solver)[0] != 'proven':
+			wrong_moves += 1
+			connectfour.render()
+	print(i + 1, 'games completed | proven moves:', proven_moves, '| wrong:', wrong_moves)
+
+print()
+print('All proven moves are winning moves' if wrong_moves == 0 else str(wrong_moves) + ' proven moves are WRONG')
+if wrong_moves > 0:
+	sys.exit(1)
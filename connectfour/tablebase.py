@@ -0,0 +1,154 @@
+'''Tablebase
+
+This file contains complete tablebases of the values of small 'ConnectFour' boards. Comments:
+
+	A position is identified by a perfect index: a column with h discs is the number
+	(bits of the discs of player x in the column) + 2**h - 1 in {0,...,2**(num_of_rows+1)-2}, where the
+	bottom disc is the lowest bit. The index of a position is the number with these digits in base
+	2**(num_of_rows+1)-1, where column 0 is the lowest digit. Every board on which the discs lie on top
+	of each other has exactly one index, so no keys have to be stored.
+
+	The value of a position with perfect play of both players is stored in 2 bits: 0 if the position
+	cannot be reached from the empty board, 1 for a draw, 2 if player x wins and 3 if player o wins.
+	Four values are packed into one byte, so a tablebase takes (2**(num_of_rows+1)-1)**num_of_columns/4 bytes,
+	for example 0.2 megabyte for 4x4, 7 megabyte for 4x5 and 250 megabyte for 5x5.
+
+The most important function is 'build_tablebase(num_of_rows, num_of_columns)':
+
+	It solves every position that can be reached from the empty board by a memoized search on bitboards
+	that writes the values directly into the packed array. A position and its mirror image share their value.
+
+The class 'Tablebase' opens a saved tablebase read-only with mmap. 'value(game)' returns the value of the
+position of a 'ConnectFour' game and 'best_actions(game)' the actions that keep this value.
+'''
+
+
+import numpy as np
+
+
+UNREACHABLE, DRAW, X_WINS, O_WINS = 0, 1, 2, 3
+VALUES = {DRAW: 0, X_WINS: 1, O_WINS: -1}
+
+
+def build_tablebase(num_of_rows, num_of_columns):
+	'''Returns the packed values of all reachable positions of a board as a bytearray'''
+
+	H = num_of_rows + 1
+	base = 2**H - 1
+	powers = [base**c for c in range(num_of_columns)]
+	mirrored_powers = powers[::-1]
+	shifts = [1, H, H - 1, H + 1]
+	number_of_cells = num_of_rows*num_of_columns
+	heights = [0]*num_of_columns
+	table = bytearray((base**num_of_columns + 3)//4)
+
+	def read(index):
+		return (table[index >> 2] >> ((index & 3)*2)) & 3
+
+	def write(index, mirror, value):
+		table[index >> 2] |= value << ((index & 3)*2)
+		table[mirror >> 2] |= value << ((mirror & 3)*2)
+
+	def won(bits):
+		for shift in shifts:
+			pairs = bits & (bits >> shift)
+			if pairs & (pairs >> 2*shift):
+				return True
+		return False
+
+	def solve(own, other, index, mirror, count):
+		'''Returns the value of the position, 'own' are the bits of the player to move'''
+
+		value = read(index)
+		if value:
+			return value
+		value = read(mirror)
+		if value:
+			write(index, mirror, value)
+			return value
+
+		# Player x is to move if the number of discs is even
+		x_to_move = count % 2 == 0
+		win, loss = (X_WINS, O_WINS) if x_to_move else (O_WINS, X_WINS)
+		best = loss
+		for column in range(num_of_columns):
+			h = heights[column]
+			if h == num_of_rows:
+				continue
+			bit = 1 << (column*H + h)
+			step = (2 << h) if x_to_move else (1 << h)
+			child_index = index + step*powers[column]
+			child_mirror = mirror + step*mirrored_powers[column]
+			moved = own | bit
+			if won(moved):
+				value = win
+				if not read(child_index):
+					write(child_index, child_mirror, value)
+			elif count + 1 == number_of_cells:
+				value = DRAW
+				if not read(child_index):
+					write(child_index, child_mirror, value)
+			else:
+				heights[column] += 1
+				value = solve(other, moved, child_index, child_mirror, count + 1)
+				heights[column] -= 1
+			if value == win or (value == DRAW and best == loss):
+				best = value
+		write(index, mirror, best)
+		return best
+
+	solve(0, 0, 0, 0, 0)
+	return table
+
+
+def save_tablebase(file_path, table):
+	np.save(file_path, np.frombuffer(table, dtype=np.uint8))
+
+
+class Tablebase:
+	def __init__(self, file_path, num_of_rows, num_of_columns):
+		self.num_of_rows = num_of_rows
+		self.num_of_columns = num_of_columns
+		self.H = num_of_rows + 1
+		self.base = 2**self.H - 1
+		self.table = np.load(file_path, mmap_mode='r')
+		if len(self.table) != (self.base**num_of_columns + 3)//4:
+			raise ValueError('the tablebase does not belong to a board with ' + str(num_of_rows) + ' rows and ' + str(num_of_columns) + ' columns')
+
+	def index(self, game):
+		'''Returns the perfect index of the position of 'game' '''
+
+		column_bits = (1 << self.H) - 1
+		index = 0
+		for column in range(self.num_of_columns - 1, -1, -1):
+			shift = column*self.H
+			index = index*self.base + ((game.bits[0] >> shift) & column_bits) + ((game.mask >> shift) & column_bits)
+		return index
+
+	def code(self, index):
+		return (int(self.table[index >> 2]) >> ((index & 3)*2)) & 3
+
+	def value(self, game):
+		'''Returns the value of the position of 'game' (1 if x wins, -1 if o wins, 0 for a draw) or None if it is not reachable'''
+
+		return VALUES.get(self.code(self.index(game)))
+
+	def best_actions(self, game):
+		'''Returns the legal actions after which the value of the position stays the same'''
+
+		value = self.value(game)
+		actions = []
+		for action in game.legal_actions():
+			game.execute(action)
+			if self.value(game) == value:
+				actions.append(action)
+			game.undo(action)
+		return actions
+
+	def counts(self):
+		'''Returns the numbers of reachable positions that are a draw, a win of x and a win of o'''
+
+		counts = np.zeros(4, dtype=np.int64)
+		for shift in range(0, 8, 2):
+			counts += np.bincount((self.table >> shift) & 3, minlength=4)
+		return {'draw': counts[DRAW].item(), 'x wins': counts[X_WINS].item(), 'o wins': counts[O_WINS].item()}
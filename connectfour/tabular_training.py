@@ -0,0 +1,124 @@
+'''Tabular training
+
+This file can be run to start a training for a QPlayer and a TDPlayer on Connect Four.
+Below you can specify the parameters for each player.
+
+In the end it will create a new directory './training_data/tabular_#' where '#' is a unique index
+to a training session. It will contain each player saved as a pickle file and a pickle file of a
+dictionary with all the information of the training.
+
+	The tables of both players are bounded hash tables (see 'hashtable.py'). A table holds at most
+	'capacity' entries (rounded up to a power of 2), so its memory use is fixed before the training.
+	When a table is full, entries are evicted by the policy 'eviction': 'least_visited' or 'age'.
+'''
+
+
+import os
+import pickle
+import time
+
+from game import ConnectFour
+from players import QPlayer, TDPlayer
+
+
+# Initialize game
+connectfour = ConnectFour()
+
+
+# Table parameters
+capacity = 2**20
+eviction = 'least_visited'
+
+
+# Initialize Q Player
+alpha_q = 0.3
+epsilon_q = 0.2
+gamma_q = 0.9
+qplayer = QPlayer(alpha_q, epsilon_q, gamma_q, capacity, eviction)
+
+
+# Initialize TD Player
+alpha_td = 0.3
+epsilon_td = 0.2
+gamma_td = 0.9
+lanbda_td = 0.8
+tdplayer = TDPlayer(alpha_td, epsilon_td, gamma_td, lanbda_td, capacity, eviction)
+
+
+# Training parameters
+render = True
+number_of_games_q = 100000
+number_of_games_td = 50000
+
+
+# Training
+time1 = time.time()
+qplayer.train(connectfour, number_of_games_q, render)
+time2 = time.time()
+tdplayer.train(connectfour, number_of_games_td, render)
+time3 = time.time()
+
+
+# Training info
+training_time_q = time2 - time1
+training_time_td = time3 - time2
+statistics_q1 = qplayer.Q1.statistics()
+statistics_q2 = qplayer.Q2.statistics()
+statistics_v = tdplayer.V.statistics()
+
+
+#Print training info
+print('Duration of Q Player training:', round(training_time_q, 0), 'seconds')
+print('Duration of TD Player training:', round(training_time_td, 0), 'seconds')
+print()
+print('Entries of Q1, Q2 of Q Player:', statistics_q1['size'], statistics_q2['size'], ' | evictions:', statistics_q1['evictions'] + statistics_q2['evictions'])
+print('Entries of V of TD Player:', statistics_v['size'], ' | evictions:', statistics_v['evictions'])
+print('Memory size of each table:', statistics_v['memory_size'], 'bytes which is around', round(statistics_v['memory_size']/1000000, 1), 'megabyte')
+print()
+
+
+# Make new directory
+dir_path = './training_data/'
+if not os.path.isdir(dir_path):
+	os.mkdir(dir_path)
+dir_path += 'tabular_'
+index = 1
+while os.path.isdir(dir_path + str(index)):
+	index += 1
+dir_path += str(index)
+os.mkdir(dir_path)
+
+
+# Save players as pickle files
+with open(dir_path + '/qplayer.pickle', 'wb') as file:
+	pickle.dump(qplayer, file)
+with open(dir_path + '/tdplayer.pickle', 'wb') as file:
+	pickle.dump(tdplayer, file)
+
+
+# Training info
+training_info = {
+	'capacity' : capacity,
+	'eviction' : eviction,
+
+	'alpha_q' : alpha_q,
+	'epsilon_q' : epsilon_q,
+	'gamma_q' : gamma_q,
+	'number_of_games_q' : number_of_games_q,
+	'training_time_q' : training_time_q,
+	'statistics_q1' : statistics_q1,
+	'statistics_q2' : statistics_q2,
+
+	'alpha_td' : alpha_td,
+	'epsilon_td' : epsilon_td,
+	'gamma_td' : gamma_td,
+	'lanbda_td' : lanbda_td,
+	'number_of_games_td' : number_of_games_td,
+	'training_time_td' : training_time_td,
+	'statistics_v' : statistics_v,
+}
+
+
+# Save training info as pickle file
+with open(dir_path + '/training_info.pickle', 'wb') as file:
+	pickle.dump(training_info, file)
@@ -8,12 +8,30 @@ import random
 import copy
 import pickle
 import os
+import torch
 import matplotlib.pyplot as plt
 
 from statistics import mean
+from time import perf_counter
 
+from players import DeepPlayer
+from neuralnetwork import net_state_dict, script_net, reduced_precision_net
+from valuecache import ValueCache
+from profiling import NO_PHASE
 
-def play(game, player_x, player_o, first_action_random, render):
+
+def play(game, player_x, player_o, first_action_random, render, latencies=None, profiler=None):
+	'''Plays one game between player_x and player_o
+
+		If 'latencies' is a dictionary, the duration of every call of 'choice' is recorded in it,
+		see 'record_latency'. By default nothing is timed.
+
+		If 'profiler' is a 'Profiler' (see 'profiling.py'), the game and the phases 'choice' of
+		every player and 'execute' are reported to it.
+	'''
+
+	if profiler is not None:
+		profiler.begin_game()
 	game.reset()
 	if render:
 		game.render()
@@ -23,27 +41,339 @@ def play(game, player_x, player_o, first_action_random, render):
 		if render:
 			game.render()
 	while not game.terminated:
-		if game.player == 1:
-			action = player_x.choice(game)
-		else:
-			action = player_o.choice(game)
-		game.execute(action)
+		player = player_x if game.player == 1 else player_o
+		with NO_PHASE if profiler is None else profiler.phase('choice ' + player.name):
+			if latencies is None:
+				action = player.choice(game)
+			else:
+				start = perf_counter()
+				action = player.choice(game)
+				record_latency(latencies, player.name, game.time, perf_counter() - start)
+		with NO_PHASE if profiler is None else profiler.phase('execute'):
+			game.execute(action)
 		if render:
 			game.render()
+	if profiler is not None:
+		profiler.end_game()
 
 
-def evaluation(game, players, games_per_pair, first_action_random):
+def evaluation(game, players, games_per_pair, first_action_random, latencies=None, profiler=None):
 	scores = {}
 	for player_x in players:
 		for player_o in players:
 			score = {'x':0, 'o': 0, None: 0}
 			for i in range(games_per_pair):
-				play(game, player_x, player_o, first_action_random, False)
+				play(game, player_x, player_o, first_action_random, False, latencies, profiler)
 				score[game.winner] += 1
 			scores[(player_x.name, player_o.name)] = score
 	return scores
 
 
+def play_batch(game, player_x, player_o, number_of_games, first_action_random):
+	'''Plays several games between player_x and player_o in lockstep
+
+		Each game is a copy of 'game'. Players that have a function 'batch_choice(games)'
+		choose their actions for all running games at once, the other players choose game by game.
+		Returns the list of winners.
+	'''
+
+	games = [copy.deepcopy(game) for i in range(number_of_games)]
+	for game in games:
+		game.reset()
+		if first_action_random:
+			game.execute(random.choice(game.legal_actions()))
+
+	running = games
+	while running:
+		for player, sign in [(player_x, 1), (player_o, -1)]:
+			to_move = [game for game in running if game.player == sign and not game.terminated]
+			if not to_move:
+				continue
+			if hasattr(player, 'batch_choice'):
+				actions = player.batch_choice(to_move)
+			else:
+				actions = [player.choice(game) for game in to_move]
+			for game, action in zip(to_move, actions):
+				game.execute(action)
+		running = [game for game in running if not game.terminated]
+
+	return [game.winner for game in games]
+
+
+def batched_evaluation(game, players, games_per_pair, first_action_random, number_of_parallel_games):
+	'''Same as 'evaluation', but plays up to 'number_of_parallel_games' games per pair in lockstep'''
+
+	scores = {}
+	for player_x in players:
+		for player_o in players:
+			score = {'x':0, 'o': 0, None: 0}
+			remaining = games_per_pair
+			while remaining > 0:
+				number_of_games = min(remaining, number_of_parallel_games)
+				for winner in play_batch(game, player_x, player_o, number_of_games, first_action_random):
+					score[winner] += 1
+				remaining -= number_of_games
+			scores[(player_x.name, player_o.name)] = score
+	return scores
+
+
+def save_weights(file_path, deepplayer, info):
+	'''Saves only the weights of the network of a Deep Player
+
+		The dictionary 'info' is saved as a header. It has to contain at least the keys
+		'alpha', 'gamma', 'num_central_layers' and 'central_layer_dim' that describe the player.
+		The checkpoints of 'DeepPlayer.save_checkpoint' use the same format.
+	'''
+
+	torch.save({'info': info, 'state_dict': net_state_dict(deepplayer.net)}, file_path)
+
+
+def load_weights(file_path):
+	'''Loads a Deep Player from a file created by 'save_weights'
+
+		The player is meant for playing, its epsilon is 0.
+	'''
+
+	return deepplayer_from_weights(torch.load(file_path))
+
+
+def deepplayer_from_weights(checkpoint):
+	info = checkpoint['info']
+	deepplayer = DeepPlayer(info['alpha'], 0, info['gamma'], info['num_central_layers'], info['central_layer_dim'])
+	deepplayer.net.load_state_dict(checkpoint['state_dict'])
+	return deepplayer
+
+
+def load_checkpoint(dir_path):
+	'''Loads a Deep Player from the checkpoint in 'dir_path' to resume its training
+
+		Other than 'load_weights', this also restores the state of the optimizer and epsilon.
+		Returns the player and the header of the checkpoint.
+	'''
+
+	checkpoint = torch.load(dir_path + '/deepplayer_weights.pt')
+	deepplayer = deepplayer_from_weights(checkpoint)
+	training_state = torch.load(dir_path + '/deepplayer_optimizer.pt')
+	deepplayer.optimizer.load_state_dict(training_state['optimizer'])
+	deepplayer.epsilon = training_state['epsilon']
+	return deepplayer, checkpoint['info']
+
+
+def export_scripted(dir_path, deepplayer):
+	'''Saves the network of a Deep Player as a TorchScript module in 'deepplayer_scripted.pt'
+
+		The file can be loaded without the training code, see 'load_scripted'.
+	'''
+
+	torch.jit.save(script_net(deepplayer.net), dir_path + '/deepplayer_scripted.pt')
+
+
+def load_scripted(file_path):
+	'''Loads a Deep Player for playing whose network is a TorchScript module
+
+		The player cannot be trained, it has no optimizer and its updates raise a RuntimeError.
+	'''
+
+	# The network built by the constructor is only a placeholder and is replaced together with its optimizer
+	deepplayer = DeepPlayer(0, 0, 0, 0, 1)
+	deepplayer.net = torch.jit.load(file_path)
+	deepplayer.optimizer = None
+	return deepplayer
+
+
+def load_deepplayer(dir_path, scripted=True):
+	'''Loads the Deep Player of a training directory for playing
+
+		If 'scripted' is True, the TorchScript module is loaded if the directory contains
+		'deepplayer_scripted.pt'. Otherwise only the weights are loaded if it contains
+		'deepplayer_weights.pt', or else the pickled player of an older training is loaded.
+	'''
+
+	if scripted and os.path.isfile(dir_path + '/deepplayer_scripted.pt'):
+		return load_scripted(dir_path + '/deepplayer_scripted.pt')
+	if os.path.isfile(dir_path + '/deepplayer_weights.pt'):
+		return load_weights(dir_path + '/deepplayer_weights.pt')
+	with open(dir_path + '/deepplayer.pickle', 'rb') as file:
+		return pickle.load(file)
+
+
+def reduced_precision_player(deepplayer, precision):
+	'''Returns a copy of a Deep Player for playing whose network computes in reduced precision, see 'reduced_precision_net' '''
+
+	player = copy.copy(deepplayer)
+	player.name = deepplayer.name + '(' + precision + ')'
+	player.net = reduced_precision_net(deepplayer.net, precision)
+	player.optimizer = None
+	if deepplayer.cache is not None:
+		player.cache = ValueCache(deepplayer.cache.capacity)
+	return player
+
+
+def random_positions(game, number_of_positions, max_random_actions=None):
+	'''Returns copies of 'game' in non-terminal positions reached by random actions from the empty board'''
+
+	if max_random_actions is None:
+		max_random_actions = game.max_time - 1
+	positions = []
+	while len(positions) < number_of_positions:
+		game.reset()
+		for k in range(random.randint(0, max_random_actions)):
+			game.execute(random.choice(game.legal_actions()))
+			if game.terminated:
+				break
+		if not game.terminated:
+			positions.append(copy.deepcopy(game))
+	game.reset()
+	return positions
+
+
+def move_agreement(player, other_player, positions):
+	'''Returns the share of positions in which both players choose the same action
+
+		Both players need a function 'batch_choice(games)' and should have epsilon 0.
+	'''
+
+	actions = player.batch_choice(positions)
+	other_actions = other_player.batch_choice(positions)
+	agreements = sum(1 for action, other_action in zip(actions, other_actions) if action == other_action)
+	return agreements/len(positions)
+
+
+def extract_weights(dir_path):
+	'''Saves the weights of the pickled Deep Player in 'dir_path' as 'deepplayer_weights.pt'
+
+		This has to be done only once per training directory. Afterwards the player
+		can be loaded with 'load_weights' without unpickling the whole player.
+	'''
+
+	with open(dir_path + '/deepplayer.pickle', 'rb') as file:
+		deepplayer = pickle.load(file)
+	with open(dir_path + '/training_info.pickle', 'rb') as file:
+		training_info = pickle.load(file)
+	save_weights(dir_path + '/deepplayer_weights.pt', deepplayer, training_info)
+
+
+def gauntlet_scores(game, deepplayer, opponents, games_per_pair, first_action_random):
+	'''Lets a Deep Player play against every opponent as player x and as player o
+
+		Returns the scores per opponent and side and the points of the Deep Player,
+		where a win counts 1 and a draw counts 0.5.
+	'''
+
+	scores = {}
+	points = 0
+	for opponent in opponents:
+		for side in ['x', 'o']:
+			if side == 'x':
+				winners = play_batch(game, deepplayer, opponent, games_per_pair, first_action_random)
+			else:
+				winners = play_batch(game, opponent, deepplayer, games_per_pair, first_action_random)
+			score = {'win': 0, 'loss': 0, 'draw': 0}
+			for winner in winners:
+				if winner is None:
+					score['draw'] += 1
+				elif winner == side:
+					score['win'] += 1
+				else:
+					score['loss'] += 1
+			scores[(opponent.name, side)] = score
+			points += score['win'] + 0.5*score['draw']
+	return {'scores': scores, 'points': points, 'games': 2*len(opponents)*games_per_pair}
+
+
+def record_latency(latencies, name, move_number, duration):
+	'''Stores the duration (in seconds) of a call of 'choice' in latencies[name][move_number]'''
+
+	per_move = latencies.get(name)
+	if per_move is None:
+		per_move = latencies[name] = {}
+	durations = per_move.get(move_number)
+	if durations is None:
+		durations = per_move[move_number] = []
+	durations.append(duration)
+
+
+def percentiles(durations):
+	'''Returns count, p50, p95, p99 and max of a list of durations (nearest-rank method)'''
+
+	durations = sorted(durations)
+	n = len(durations)
+	stats = {'count': n}
+	for name, q in [('p50', 50), ('p95', 95), ('p99', 99)]:
+		stats[name] = durations[max(0, -(-q*n//100) - 1)]
+	stats['max'] = durations[-1]
+	return stats
+
+
+def latency_report(latencies):
+	'''Aggregates recorded latencies per player, overall and per move number'''
+
+	report = {}
+	for name, per_move in latencies.items():
+		all_durations = []
+		for durations in per_move.values():
+			all_durations += durations
+		report[name] = {
+			'overall' : percentiles(all_durations),
+			'per_move' : {move_number: percentiles(per_move[move_number]) for move_number in sorted(per_move)}
+		}
+	return report
+
+
+def save_latency_report(file_path, latencies, budget=None):
+	'''Saves the latency report as a pickle file and as a readable text file next to it
+
+		If a budget (in seconds) is given, players whose p99 exceeds it are marked.
+	'''
+
+	report = latency_report(latencies)
+	with open(file_path, 'wb') as file:
+		pickle.dump(report, file)
+
+	lines = []
+	for name, stats in report.items():
+		overall = stats['overall']
+		line = name + ': ' + str(overall['count']) + ' moves'
+		for key in ['p50', 'p95', 'p99', 'max']:
+			line += ' | ' + key + ' ' + str(round(overall[key]*1000, 3)) + ' ms'
+		if budget is not None and overall['p99'] > budget:
+			line += ' | p99 exceeds budget of ' + str(round(budget*1000, 3)) + ' ms'
+		lines.append(line)
+		for move_number, move_stats in stats['per_move'].items():
+			line = '    move ' + str(move_number) + ': ' + str(move_stats['count']) + ' moves'
+			for key in ['p50', 'p95', 'p99', 'max']:
+				line += ' | ' + key + ' ' + str(round(move_stats[key]*1000, 3)) + ' ms'
+			lines.append(line)
+
+	i = file_path.find('.pickle')
+	with open(file_path[:i] + '.txt', 'w') as file:
+		file.write('\n'.join(lines) + '\n')
+
+	return report
+
+
+def compare_benchmarks(results, baseline, threshold):
+	'''Returns the relative changes of the metrics of a benchmark to a baseline and the names of the regressions
+
+		The name of a metric is 'kind/name'. Metrics whose kind ends with 'per_second' are better when they
+		are higher, all other metrics (latencies and memory sizes) are better when they are lower.
+		A metric is a regression if it is worse than in the baseline by more than the fraction 'threshold'.
+	'''
+
+	changes = {}
+	regressions = []
+	for name, value in results.items():
+		old_value = baseline.get(name)
+		if not old_value:
+			continue
+		change = (value - old_value)/old_value
+		changes[name] = change
+		worse = -change if name.split('/')[0].endswith('per_second') else change
+		if worse > threshold:
+			regressions.append(name)
+	return changes, regressions
+
+
 def visualize_scores(file_path):
 	with open(file_path, 'rb') as file:
 		scores = pickle.load(file)
@@ -3,10 +3,29 @@
 This file can be run to start a training for a DeepPlayer.
 Below you can specify the parameters of the player.
 
-In the end it will create a new directory './training_data/training_#' where '#' is
-a unique index to a training session. It will contain the player saved as a pickle file,
-a pickle file of a dictionary with all the information of the training and a
-visualization of the loss of the DeepPlayer.
+It will create a new directory './training_data/training_#' where '#' is a unique index to
+a training session. It will contain the weights of the player with a header of its architecture
+and hyperparameters ('deepplayer_weights.pt'), the state of the optimizer ('deepplayer_optimizer.pt'),
+a pickle file of a dictionary with all the information of the training and a visualization of
+the loss of the DeepPlayer. If 'export_for_inference' is True, it will also contain the network
+compiled as a TorchScript module ('deepplayer_scripted.pt'), which is used for playing.
+
+	Every 'checkpoint_after' games the two files of the player are saved in the directory.
+	If a training was interrupted, you can resume it from its latest checkpoint by setting
+	'resume_index' to the index of its directory. The parameters of the player are then taken
+	from the checkpoint.
+
+	If you set 'number_of_actors' in 'parallel_parameters' to a positive number, the games are
+	played by that many actor processes and this process only learns from them in batches.
+
+	If you set 'use_replay' in 'replay_parameters' to True, the player learns from minibatches
+	sampled from a replay buffer of its recent games instead of only from the last game.
+
+	If you set 'use_dataset' in 'supervised_parameters' to True, a new player is first trained
+	on a dataset of positions labelled by a search before it plays against itself.
+
+	If you set 'profile' in 'profile_parameters' to True, the training is profiled (see 'profiling.py')
+	and the results are saved in the directory. Only the training without actors is profiled.
 '''
 
 
@@ -16,11 +35,17 @@ import time
 
 from game import ConnectFour
 from players import DeepPlayer
-from tools import visualize_loss
+from tools import visualize_loss, load_checkpoint, export_scripted
+from dataset import dataset_loader
+from profiling import Profiler
+
+
+# Initialize game, it keeps the encoding of its position for the network up to date
+connectfour = ConnectFour(track_features=True)
 
 
-# Initialize game
-connectfour = ConnectFour()
+# Choose the index of a training directory to resume its training or None to start a new training
+resume_index = None
 
 
 # Initialize Deep Player
@@ -29,12 +54,23 @@ epsilon = 0.2
 gamma = 0.9
 num_central_layers = 1
 central_layer_dim = 40
-deepplayer = DeepPlayer(alpha, epsilon, gamma, num_central_layers, central_layer_dim)
+if resume_index is None:
+	deepplayer = DeepPlayer(alpha, epsilon, gamma, num_central_layers, central_layer_dim)
+	games_played = 0
+else:
+	dir_path = './training_data/training_' + str(resume_index)
+	deepplayer, info = load_checkpoint(dir_path)
+	alpha, epsilon, gamma = info['alpha'], info['epsilon'], info['gamma']
+	num_central_layers, central_layer_dim = info['num_central_layers'], info['central_layer_dim']
+	games_played = info['games_played']
 
 
 # Training parameters
 render = True
 
+# If True, every state is also learned in its reflected form
+augment = False
+
 number_of_games = 70
 
 decrease_parameters = {
@@ -45,15 +81,102 @@ decrease_parameters = {
 	'decrease_after' : number_of_games/10
 }
 
+replay_parameters = {
+	'use_replay' : False,
+	'capacity' : 100000,
+	'batch_size' : 64,
+	'updates_per_game' : 4,
+	'prioritized' : False
+}
+
+parallel_parameters = {
+	'number_of_actors' : 0,
+	'batch_size' : 8,
+	'sync_after' : 10
+}
+
+# If 'use_dataset' is True, the player is first trained on the labelled positions of a dataset (see 'build_dataset.py')
+supervised_parameters = {
+	'use_dataset' : False,
+	'dir_path' : './dataset_data/dataset_1',
+	'number_of_epochs' : 1,
+	'batch_size' : 256,
+	'number_of_workers' : 0
+}
+
+checkpoint_after = 1000
+
+# The windows of cProfile and torch.profiler are (first game, number of games) or None
+profile_parameters = {
+	'profile' : False,
+	'cprofile_games' : (1, 10),
+	'phase_timers' : True,
+	'torch_profiler_games' : (1, 2)
+}
+
+export_for_inference = True
+
+
+# Make new directory
+if resume_index is None:
+	dir_path = './training_data/'
+	if not os.path.isdir(dir_path):
+		os.mkdir(dir_path)
+	dir_path +=  '/training_'
+	index = 1
+	while True:
+		path = dir_path + str(index)
+		if os.path.isdir(path):
+			index += 1
+		else:
+			break
+	dir_path += str(index)
+	os.mkdir(dir_path)
+
+
+# Training info
+training_info = {
+	'alpha' : alpha,
+	'epsilon' : epsilon,
+	'gamma' : gamma,
+	'num_central_layers' : num_central_layers,
+	'central_layer_dim' : central_layer_dim,
+	'number_of_games' : number_of_games,
+	'decrease_parameters' : decrease_parameters,
+	'augment' : augment,
+	'replay_parameters' : replay_parameters,
+	'parallel_parameters' : parallel_parameters,
+	'supervised_parameters' : supervised_parameters,
+}
+
+checkpoint_parameters = {
+	'dir_path' : dir_path,
+	'checkpoint_after' : checkpoint_after,
+	'games_played' : games_played,
+	'info' : training_info
+}
+
 
 # Training the approximate player
+if profile_parameters['profile']:
+	deepplayer.profiler = Profiler(profile_parameters['cprofile_games'], profile_parameters['phase_timers'], profile_parameters['torch_profiler_games'])
 time1 = time.time()
-loss = deepplayer.train(connectfour, number_of_games, decrease_parameters, render)
+if supervised_parameters['use_dataset'] and resume_index is None:
+	loader = dataset_loader(supervised_parameters['dir_path'], supervised_parameters['batch_size'], supervised_parameters['number_of_workers'])
+	training_info['supervised_loss'] = deepplayer.train_supervised(loader, supervised_parameters['number_of_epochs'], render)
+if parallel_parameters['number_of_actors'] > 0:
+	loss = deepplayer.train_parallel(connectfour, number_of_games, decrease_parameters, parallel_parameters, render, augment, checkpoint_parameters)
+else:
+	loss = deepplayer.train(connectfour, number_of_games, decrease_parameters, render, replay_parameters, augment, checkpoint_parameters)
 time2 = time.time()
 
 
 # Training info
 training_time = time2 - time1
+if resume_index is not None and os.path.isfile(dir_path + '/training_info.pickle'):
+	with open(dir_path + '/training_info.pickle', 'rb') as file:
+		training_time += pickle.load(file)['training_time']
+training_info['training_time'] = training_time
 
 
 #Print training info
@@ -61,28 +184,22 @@ print('Duration of Deep Player training:', round(training_time, 0), 'seconds')
 print()
 
 
-# Make new directory
-dir_path = './training_data/'
-if not os.path.isdir(dir_path):
-	os.mkdir(dir_path)
-dir_path +=  '/training_'
-index = 1
-while True:
-	path = dir_path + str(index)
-	if os.path.isdir(path):
-		index += 1
-	else:
-		break
-dir_path += str(index)
-os.mkdir(dir_path)
+# Save profile
+if deepplayer.profiler is not None:
+	deepplayer.profiler.save(dir_path)
+	deepplayer.profiler = None
 
 
-# Save player as pickle files
-with open(dir_path + '/deepplayer.pickle', 'wb') as file:
-	pickle.dump(deepplayer, file)
+# Save player as checkpoint
+deepplayer.save_checkpoint(dir_path, number_of_games, training_info)
+if export_for_inference:
+	export_scripted(dir_path, deepplayer)
 
 
-# Save loss in a pickle file
+# Save loss in a pickle file, the loss of a resumed training is appended to the previous loss
+if resume_index is not None and os.path.isfile(dir_path + '/loss_of_deepplayer.pickle'):
+	with open(dir_path + '/loss_of_deepplayer.pickle', 'rb') as file:
+		loss = pickle.load(file) + loss
 with open(dir_path + '/loss_of_deepplayer.pickle', 'wb') as file:
 	pickle.dump(loss, file)
 
@@ -91,19 +208,6 @@ with open(dir_path + '/loss_of_deepplayer.pickle', 'wb') as file:
 visualize_loss(dir_path + '/loss_of_deepplayer.pickle', number_of_games, num_central_layers, central_layer_dim)
 
 
-# Training info
-training_info = {
-	'alpha' : alpha,
-	'epsilon' : epsilon,
-	'gamma' : gamma,
-	'num_central_layers' : num_central_layers,
-	'central_layer_dim' : central_layer_dim,
-	'number_of_games' : number_of_games,
-	'decrease_parameters' : decrease_parameters,
-	'training_time' : training_time,
-}
-
-
 # Save training info as pickle file
 with open(dir_path + '/training_info.pickle', 'wb') as file:
-	pickle.dump(training_info, file)
\ No newline at end of file
+	pickle.dump(training_info, file)
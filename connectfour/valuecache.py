@@ -0,0 +1,47 @@
+'''Value cache
+
+This file contains a cache for the values that the network of the class 'DeepPlayer' assigns to positions. Comments:
+
+	The cache holds at most 'capacity' values. When it is full, the least recently used value is removed.
+	Every value is stored together with the version of the weights it was computed with. A value
+	is only returned for the same version, so values of outdated weights are never used.
+	The numbers of hits and misses are counted.
+'''
+
+
+from collections import OrderedDict
+
+
+class ValueCache:
+	def __init__(self, capacity):
+		self.capacity = capacity
+		self.values = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		return len(self.values)
+
+	def get(self, key, version):
+		entry = self.values.get(key)
+		if entry is not None and entry[0] == version:
+			self.values.move_to_end(key)
+			self.hits += 1
+			return entry[1]
+		self.misses += 1
+		return None
+
+	def put(self, key, version, value):
+		self.values[key] = (version, value)
+		self.values.move_to_end(key)
+		if len(self.values) > self.capacity:
+			self.values.popitem(last=False)
+
+	def statistics(self):
+		lookups = self.hits + self.misses
+		return {
+			'hits' : self.hits,
+			'misses' : self.misses,
+			'hit_rate' : self.hits/lookups if lookups > 0 else 0,
+			'size' : len(self.values)
+		}
@@ -0,0 +1,52 @@
+'''Build dataset
+
+This file can be run to build a dataset of labelled positions for the training of a DeepPlayer.
+
+It will create a new directory './dataset_data/dataset_#' where '#' is a unique index to a dataset.
+It will contain the shards of the dataset and the file 'dataset_info.pickle' (see 'dataset.py').
+
+	The dataset contains every position of the game together with its exact value.
+
+	In 'training.py' you can train the DeepPlayer on the dataset before it plays against itself.
+'''
+
+
+import os
+import time
+
+from game import TicTacToe
+from dataset import solved_positions, ShardWriter
+
+
+# Initialize game, it keeps the encoding of its position for the network up to date
+tictactoe = TicTacToe(track_features=True)
+
+
+# Dataset parameters
+shard_size = 2000
+
+
+# Make new directory
+dir_path = './dataset_data/'
+if not os.path.isdir(dir_path):
+	os.mkdir(dir_path)
+dir_path += 'dataset_'
+index = 1
+while os.path.isdir(dir_path + str(index)):
+	index += 1
+dir_path += str(index)
+
+
+# Label positions
+time1 = time.time()
+states, values = solved_positions(tictactoe)
+writer = ShardWriter(dir_path, len(tictactoe.features), shard_size, {'game' : tictactoe.name})
+writer.add(states, values)
+writer.close()
+time2 = time.time()
+
+
+# Print dataset info
+print('Dataset saved in', dir_path)
+print('Number of positions:', len(states), ' | number of shards:', len(writer.shard_sizes))
+print('Duration:', round(time2 - time1, 1), 'seconds')
@@ -0,0 +1,158 @@
+'''Dataset of labelled positions
+
+This file contains the tools to train the network of the class 'DeepPlayer' offline from positions
+whose values were computed by a search. Comments:
+
+	A position is stored as its encoding for the network (see 'preprocess' in 'players.py') and its
+	value in [-1,1] from the view of player x. The value is exact, it is computed by a search of the
+	whole game tree as in 'game_tree_info.py'.
+
+	The positions are written in shards by the class 'ShardWriter'. Every shard consists of the files
+	'states_#.npy' and 'values_#.npy', and 'dataset_info.pickle' describes all shards of the dataset.
+
+	The class 'ShardedDataset' streams minibatches from the shards. The shards are memory-mapped,
+	so only the drawn minibatches are read and the dataset does not need to fit into memory.
+	With 'dataset_loader' the minibatches can be read by several worker processes.
+'''
+
+
+import os
+import pickle
+import random
+import numpy as np
+import torch
+
+
+def Phi(game, V):
+	'''Returns the value of the position of 'game' and stores the values of all positions below it in V
+
+		The keys of V are the boards together with the player to move and the values of V are
+		pairs of the encoding of the position and its value.
+	'''
+
+	state = tuple(game.board) + (game.player,)
+	if state in V:
+		return V[state][1]
+	if game.terminated:
+		if game.winner == 'x':
+			v = 1
+		elif game.winner == 'o':
+			v = -1
+		else:
+			v = 0
+	else:
+		values = []
+		for action in game.legal_actions():
+			game.execute(action)
+			values.append(Phi(game, V))
+			game.undo(action)
+		v = max(values) if game.player == 1 else min(values)
+	V[state] = (list(game.features), v)
+	return v
+
+
+def solved_positions(game):
+	'''Returns the encodings and the exact values of all positions of the game
+
+		'game' has to track its features.
+	'''
+
+	game.reset()
+	V = {}
+	Phi(game, V)
+	states = [V[state][0] for state in V]
+	values = [V[state][1] for state in V]
+	return np.array(states, dtype=np.uint8), np.array(values, dtype=np.float32)
+
+
+class ShardWriter:
+	def __init__(self, dir_path, input_dim, shard_size, info=None):
+		self.dir_path = dir_path
+		self.input_dim = input_dim
+		self.shard_size = shard_size
+		self.info = {} if info is None else info
+		self.shard_sizes = []
+		self.states = []
+		self.values = []
+		self.size = 0
+		if not os.path.isdir(dir_path):
+			os.makedirs(dir_path)
+
+	def add(self, states, values):
+		'''Adds a batch of encoded states and their values, full shards are written to the disk'''
+
+		self.states.append(states)
+		self.values.append(values)
+		self.size += len(states)
+		while self.size >= self.shard_size:
+			self.write_shard(self.shard_size)
+
+	def write_shard(self, shard_size):
+		states = np.concatenate(self.states)
+		values = np.concatenate(self.values)
+		index = len(self.shard_sizes)
+
+		shard = np.lib.format.open_memmap(self.dir_path + '/states_' + str(index) + '.npy', mode='w+', dtype=np.uint8, shape=(shard_size, self.input_dim))
+		shard[:] = states[:shard_size]
+		shard.flush()
+		del shard
+		np.save(self.dir_path + '/values_' + str(index) + '.npy', values[:shard_size])
+
+		self.shard_sizes.append(shard_size)
+		self.states = [states[shard_size:]]
+		self.values = [values[shard_size:]]
+		self.size -= shard_size
+
+	def close(self):
+		'''Writes the remaining positions and the file 'dataset_info.pickle' '''
+
+		if self.size > 0:
+			self.write_shard(self.size)
+		self.info['input_dim'] = self.input_dim
+		self.info['shard_sizes'] = self.shard_sizes
+		self.info['number_of_positions'] = sum(self.shard_sizes)
+		with open(self.dir_path + '/dataset_info.pickle', 'wb') as file:
+			pickle.dump(self.info, file)
+
+
+class ShardedDataset(torch.utils.data.IterableDataset):
+	'''Yields minibatches of encoded states and targets of the network
+
+		The shards are visited in random order and the positions of a shard are shuffled.
+		If the dataset is read by several workers, every worker reads its own shards.
+	'''
+
+	def __init__(self, dir_path, batch_size):
+		super().__init__()
+		self.dir_path = dir_path
+		self.batch_size = batch_size
+		with open(dir_path + '/dataset_info.pickle', 'rb') as file:
+			self.info = pickle.load(file)
+
+	def __len__(self):
+		return sum(-(-size//self.batch_size) for size in self.info['shard_sizes'])
+
+	def __iter__(self):
+		indices = list(range(len(self.info['shard_sizes'])))
+		worker_info = torch.utils.data.get_worker_info()
+		if worker_info is not None:
+			indices = indices[worker_info.id::worker_info.num_workers]
+		random.shuffle(indices)
+
+		for index in indices:
+			states = np.load(self.dir_path + '/states_' + str(index) + '.npy', mmap_mode='r')
+			values = np.load(self.dir_path + '/values_' + str(index) + '.npy', mmap_mode='r')
+			permutation = torch.randperm(len(states)).numpy()
+			for k in range(0, len(states), self.batch_size):
+				# Sorted indices read the memory-mapped shard in one direction
+				batch = np.sort(permutation[k:k + self.batch_size])
+				x = torch.from_numpy(states[batch].astype(np.float32))
+				# The target of a value v in [-1,1] is 0.5*v + 0.5 as in the training by self-play
+				target = torch.from_numpy(0.5*values[batch] + 0.5).view(-1, 1)
+				yield x, target
+
+
+def dataset_loader(dir_path, batch_size, number_of_workers=0):
+	'''Returns a 'DataLoader' that streams the minibatches of the dataset in 'dir_path' '''
+
+	return torch.utils.data.DataLoader(ShardedDataset(dir_path, batch_size), batch_size=None, num_workers=number_of_workers)
@@ -11,7 +11,7 @@ import pickle
 
 from game import TicTacToe
 from players import HumanPlayer, RandomPlayer, PrunPlayer
-from tools import play
+from tools import play, load_tabular_players
 
 
 # Initialize game
@@ -30,10 +30,7 @@ index = 1
 
 # Load trained players
 dir_path = './training_data/training_' + str(index)
-with open(dir_path + '/qplayer.pickle', 'rb') as file:
-	qplayer = pickle.load(file)
-with open(dir_path + '/tdplayer.pickle', 'rb') as file:
-	tdplayer = pickle.load(file)
+qplayer, tdplayer = load_tabular_players(dir_path)
 with open(dir_path + '/deepplayer.pickle', 'rb') as file:
 	deepplayer = pickle.load(file)
 
@@ -8,9 +8,14 @@ You can specify the number with the variable 'games_per_pair'.
 	with the variable 'index'. It denotes the number of the directory where the
 	trained players are saved, e.g. choosing 'index = 1' will evaluate
 	the performance of the players in directory './training_data/training_1/'
+	The tables of the Q Player and the TD Player are read from memory-mapped files if they were exported.
 
 Every time this file is run, it creates an new directory './evaluation_data/evaluation_#_##'
 where '#' stands for the index you chose and '##' is the index unique to every evaluation session.
+
+	If you set 'measure_latency = True', every call of 'choice' is timed and a latency report
+	per player and per move number is saved next to the scores. Players whose p99 latency exceeds
+	'latency_budget' (in seconds) are marked in the report.
 '''
 
 
@@ -19,7 +24,7 @@ import os
 
 from game import TicTacToe
 from players import RandomPlayer, PrunPlayer
-from tools import evaluation, visualize_scores
+from tools import evaluation, visualize_scores, save_latency_report, load_tabular_players
 
 
 # Initialize game
@@ -37,10 +42,7 @@ index = 1
 
 # Load trained players
 dir_path = './training_data/training_' + str(index)
-with open(dir_path + '/qplayer.pickle', 'rb') as file:
-	qplayer = pickle.load(file)
-with open(dir_path + '/tdplayer.pickle', 'rb') as file:
-	tdplayer = pickle.load(file)
+qplayer, tdplayer = load_tabular_players(dir_path)
 with open(dir_path + '/deepplayer.pickle', 'rb') as file:
 	deepplayer = pickle.load(file)
 
@@ -55,10 +57,13 @@ deepplayer.epsilon = 0
 players = [randomplayer, prunplayer, qplayer, tdplayer, deepplayer]
 games_per_pair = 100
 first_action_random = True
+measure_latency = False
+latency_budget = 0.1
 
 
 # Evaluation
-scores = evaluation(tictactoe, players, games_per_pair, first_action_random)
+latencies = {} if measure_latency else None
+scores = evaluation(tictactoe, players, games_per_pair, first_action_random, latencies)
 
 
 # Create directory to save scores
@@ -83,4 +88,9 @@ with open(dir_path + '/scores.pickle', 'wb') as file:
 
 
 # Visualize scores
-visualize_scores(dir_path + '/scores.pickle')
\ No newline at end of file
+visualize_scores(dir_path + '/scores.pickle')
+
+
+# Save latency report
+if measure_latency:
+	save_latency_report(dir_path + '/latency.pickle', latencies, latency_budget)
\ No newline at end of file
@@ -12,17 +12,26 @@ The most important function is 'execute(self, action)':
 
 	An action is a value in the set {0,...,8} and it denotes a position on the board.
 	When the function is executed, it changes the internal values accordingly.
+
+If the game is created with 'track_features=True', it keeps the encoding of the position that is
+the input of the network of the 'DeepPlayer' in the float array 'features' (see 'preprocess' in 'players.py').
+'execute' and 'undo' only change the entries of the affected cell and of the player to move.
 '''
 
 
+from array import array
+
+
 class TicTacToe:
-	def __init__(self):
+	def __init__(self, track_features=False):
 		self.name = 'TicTacToe'
 		self.board = [0]*9
 		self.time = 0
 		self.player = 1
 		self.terminated = False
 		self.winner = None
+		self.track_features = track_features
+		self.features = self.initial_features() if track_features else None
 
 	def reset(self):
 		self.board = [0]*9
@@ -30,6 +39,25 @@ class TicTacToe:
 		self.player = 1
 		self.terminated = False
 		self.winner = None
+		self.features = self.initial_features() if self.track_features else None
+
+	def initial_features(self):
+		'''Returns the encoding of the empty board with player x to move
+
+			Every position is encoded by three entries (x, o, empty) and the player to move by two entries (x, o).
+		'''
+
+		return array('f', [0, 0, 1]*9 + [1, 0])
+
+	def flip_features(self, action):
+		'''Switches the entries of a position between empty and the player to move and switches the player to move'''
+
+		k = action*3
+		features = self.features
+		features[k if self.player == 1 else k + 1] = 1 - features[k if self.player == 1 else k + 1]
+		features[k + 2] = 1 - features[k + 2]
+		features[-2] = 1 - features[-2]
+		features[-1] = 1 - features[-1]
 
 	def render(self):
 		string = ''
@@ -65,6 +93,8 @@ class TicTacToe:
 
 	def execute(self, action):
 		self.board[action] = self.player
+		if self.features is not None:
+			self.flip_features(action)
 
 		if self.is_winner():
 			self.winner = 'x' if self.player == 1 else 'o'
@@ -83,4 +113,6 @@ class TicTacToe:
 		self.terminated = False
 		self.winner = None
 
-		self.board[action] = 0
\ No newline at end of file
+		self.board[action] = 0
+		if self.features is not None:
+			self.flip_features(action)
\ No newline at end of file
@@ -7,67 +7,85 @@ This file can be run to receive information on the game tree.
 	pruned game tree according to the Alpha-beta pruning algorihm. If you choose 'False',
 	then you will see the info of a non-pruned game tree.
 
-The function 'Phi' traverses the game tree.
+The function 'traverse' traverses the game tree. Comments:
+
+	The tree is traversed with an explicit stack instead of recursive calls. A board is identified
+	with its index in {0,...,3**9-1} (see 'qtable.py'), which is updated with every action, and the
+	visited boards are marked in a byte array of length 3**9. The memory size that is printed is the
+	size of this array. The numbers of visited nodes and leaves are counted for every depth.
 '''
 
 
-import random
+import time
 
 from math import inf as infinity
-from sys import getsizeof
 
 from game import TicTacToe
 
 
-def Phi(game, V, alpha, beta, prun):
-	state = tuple(game.board)
+def leaf_value(game):
+	if game.winner == 'x':
+		return 1
+	elif game.winner == 'o':
+		return -1
+	else:
+		return 0
+
+
+def traverse(game, visited, prun):
+	'''Returns the value of the position of 'game' and the numbers of visited nodes and leaves per depth
+
+		The entry of every visited board in 'visited' is set to 1.
+	'''
+
+	nodes = [0]*10
+	leaves = [0]*10
+	index = sum((cell % 3)*3**i for i, cell in enumerate(game.board))
+	visited[index] = 1
+	nodes[0] += 1
 	if game.terminated:
-		if game.winner == 'x':
-			V[state] = 1
-			return 1, 1, 1
-		elif game.winner == 'o':
-			V[state] = -1
-			return -1, 1, 1
+		leaves[0] += 1
+		return leaf_value(game), nodes, leaves
+
+	# A frame is [actions, number of executed actions, value, alpha, beta] of a node
+	stack = [[game.legal_actions(), 0, -infinity if game.player == 1 else infinity, -infinity, infinity]]
+	while True:
+		frame = stack[-1]
+		actions, k, v, alpha, beta = frame
+		if k == len(actions) or (prun and alpha >= beta):
+			stack.pop()
+			if not stack:
+				return v, nodes, leaves
+			frame = stack[-1]
+			action = frame[0][frame[1] - 1]
+			game.undo(action)
+			index -= (1 if game.player == 1 else 2)*3**action
+			e = v
 		else:
-			V[state] = 0
-			return 0, 1, 1
-	else:
+			frame[1] += 1
+			action = actions[k]
+			index += (1 if game.player == 1 else 2)*3**action
+			game.execute(action)
+			d = len(stack)
+			visited[index] = 1
+			nodes[d] += 1
+			if not game.terminated:
+				stack.append([game.legal_actions(), 0, -infinity if game.player == 1 else infinity, frame[3], frame[4]])
+				continue
+			leaves[d] += 1
+			e = leaf_value(game)
+			game.undo(action)
+			index -= (1 if game.player == 1 else 2)*3**action
+
+		# Player x maximizes and player o minimizes
 		if game.player == 1:
-			v = -infinity
-			count1 = 0
-			count2 = 0
-			for action in game.legal_actions():
-				game.execute(action)
-				e, c1, c2 = Phi(game, V, alpha, beta, prun)
-				v = max(v, e)
-				count1 += c1
-				count2 += c2
-				if prun:
-					alpha = max(alpha,e)
-					if alpha >= beta:
-						game.undo(action)
-						break
-				game.undo(action)
-			V[state] = v
-			return v, count1 + 1, count2
+			frame[2] = max(frame[2], e)
+			if prun:
+				frame[3] = max(frame[3], e)
 		else:
-			v = infinity
-			count1 = 0
-			count2 = 0
-			for action in game.legal_actions():
-				game.execute(action)
-				e, c1, c2 = Phi(game, V, alpha, beta, prun)
-				v = min(v, e)
-				count1 += c1
-				count2 += c2
-				if prun:
-					beta = min(beta, e)
-					if alpha >= beta:
-						game.undo(action)
-						break
-				game.undo(action)
-			V[state] = v
-			return v, count1 + 1, count2
+			frame[2] = min(frame[2], e)
+			if prun:
+				frame[4] = min(frame[4], e)
 
 
 # Initialize game
@@ -83,15 +101,23 @@ print('Game tree info of', tictactoe.name, 'with root node:', tictactoe.board)
 print('prun:', prun)
 print()
 
-V = {}
-value_of_empty_board, number_of_nodes, number_of_leaves = Phi(tictactoe, V, -infinity, infinity, prun)
-number_of_boards = len(V)
-size = getsizeof(V)
+visited = bytearray(3**9)
+time1 = time.time()
+value_of_empty_board, nodes, leaves = traverse(tictactoe, visited, prun)
+time2 = time.time()
+number_of_nodes = sum(nodes)
+number_of_leaves = sum(leaves)
+size = len(visited)
 
 print('Value of root node:', value_of_empty_board)
 print()
 print('Number of visited nodes:', number_of_nodes)
 print('Number of visited leaves:', number_of_leaves)
-print('Number of visited boards:', number_of_boards)
+print('Number of visited boards:', sum(visited))
+print()
+print('Depth | nodes | leaves')
+for d in range(10):
+	print(d, '|', nodes[d], '|', leaves[d])
 print()
-print('Memory size of V:', size, 'bytes whis is around', round(size/1000000, 1), 'megabyte')
\ No newline at end of file
+print('Duration:', round(time2 - time1, 1), 'seconds which is around', round(number_of_nodes/max(time2 - time1, 1e-9)), 'nodes per second')
+print('Memory size of the visited boards:', size, 'bytes which is around', round(size/1000000, 1), 'megabyte')
@@ -15,7 +15,7 @@ class FNN(nn.Module):
 		
 		self.first_layer = nn.Linear(input_dim, central_layer_dim)
 
-		self.central_layers = []
+		self.central_layers = nn.ModuleList()
 		for i in range(num_central_layers):
 			self.central_layers.append(nn.Linear(central_layer_dim, central_layer_dim))
 
@@ -0,0 +1,81 @@
+'''Perft
+
+This file can be run to test and benchmark the game engine ('execute', 'undo', 'legal_actions' and 'is_winner').
+Below you can specify the parameters of the benchmark.
+
+	For every position in 'positions' (given by the actions from the empty board) the number of
+	sequences of d actions that can be played from the position is counted for d = 1,...,depth.
+	A sequence ends when the game is terminated, so it only counts if it has exactly d actions.
+	The counts are compared to the stored reference counts, which were checked with an independent
+	implementation of the rules, and the number of executed actions per second is printed.
+
+	Any other implementation of the game with the same functions can be tested and compared by
+	passing its objects to 'perft'.
+'''
+
+
+import sys
+import time
+
+from game import TicTacToe
+
+
+def perft(game, depth):
+	'''Returns the number of sequences of 'depth' actions from the position of 'game' and the number of executed actions'''
+
+	if depth == 0:
+		return 1, 0
+	count = 0
+	number_of_actions = 0
+	for action in game.legal_actions():
+		game.execute(action)
+		number_of_actions += 1
+		if depth == 1:
+			count += 1
+		elif not game.terminated:
+			c, n = perft(game, depth - 1)
+			count += c
+			number_of_actions += n
+		game.undo(action)
+	return count, number_of_actions
+
+
+# Positions and their reference counts for d = 1,...,number of empty positions
+positions = {
+	'': [9, 72, 504, 3024, 15120, 54720, 148176, 200448, 127872],
+	'4': [8, 56, 336, 1680, 5760, 15984, 18432, 13248],
+	'0 4 8': [6, 30, 120, 288, 416, 192],
+	'0 3 1 4': [5, 16, 39, 60, 36],
+}
+
+
+# Set parameters
+depth = 9
+
+
+# Run perft
+tictactoe = TicTacToe()
+total_actions = 0
+total_time = 0
+correct = True
+for moves, reference in positions.items():
+	tictactoe.reset()
+	for action in moves.split():
+		tictactoe.execute(int(action))
+	print('Position:', moves if moves else 'empty board')
+	for d in range(1, min(depth, len(reference)) + 1):
+		time1 = time.time()
+		count, number_of_actions = perft(tictactoe, d)
+		time2 = time.time()
+		total_actions += number_of_actions
+		total_time += time2 - time1
+		status = 'ok' if count == reference[d-1] else 'wrong, expected ' + str(reference[d-1])
+		correct = correct and count == reference[d-1]
+		print('  depth', d, '|', count, '|', status)
+	print()
+
+print('Executed actions:', total_actions, ' | duration:', round(total_time, 1), 'seconds')
+print('Actions per second:', round(total_actions/max(total_time, 1e-9)))
+print('All counts are correct' if correct else 'Some counts are WRONG')
+if not correct:
+	sys.exit(1)
@@ -11,10 +11,17 @@ The classes 'QPlayer', 'TDPlayer', 'DeepPlayer' contain two additional important
 
 	'train_single_game(self, game)' and 'train(...)'. They are the implementations of the pseudocodes
 	that can be found in './reinforcement_learning_for_tictactoe_and_connectfour/pseudocodes.pdf'
+
+	'train_batched(...)' of the class 'QPlayer' is a variant of 'train(...)' that plays many games at once
+	on a dense Q table (see 'qtable.py').
+
+	'train_parallel(...)' of the classes 'QPlayer' and 'TDPlayer' is a variant of 'train(...)' where
+	several processes play games and update shared tables without locks.
 '''
 
 
 import random
+import numpy as np
 import torch
 import torch.nn as nn
 
@@ -23,6 +30,7 @@ from statistics import mean
 from copy import copy, deepcopy
 
 from neuralnetwork import FNN
+from qtable import DenseQTable, hogwild_train
 
 
 class HumanPlayer:
@@ -289,6 +297,46 @@ class QPlayer:
 		if render:
 			print()
 
+	def train_batched(self, number_of_games, number_of_envs, render):
+		'''Trains the player on 'number_of_games' games that are played 'number_of_envs' at a time
+
+			The games are played on a dense Q table that starts with the entries of Q1 and Q2.
+			In the end the visited entries of the table are written back into Q1 and Q2.
+		'''
+
+		if render:
+			print('Start batched training of', self.name, ' with the following parameters:')
+			print('Number of games:', number_of_games, ' | number of environments:', number_of_envs, ' | alpha:', self.alpha, ' | epsilon:', self.epsilon, ' | gamma:', self.gamma)
+			print()
+			print(0, 'games completed')
+		table = DenseQTable(np.random.default_rng())
+		table.load(self.Q1, self.Q2)
+		games_played = 0
+		while games_played < number_of_games:
+			n = min(number_of_envs, number_of_games - games_played)
+			table.train_batch(n, self.alpha, self.epsilon, self.gamma)
+			if render and (games_played + n)*10//number_of_games > games_played*10//number_of_games:
+				print(games_played + n, 'games completed')
+			games_played += n
+		table.store(self.Q1, self.Q2)
+		if render:
+			print()
+
+	def train_parallel(self, game, number_of_games, number_of_processes, render):
+		'''Trains the player on 'number_of_games' games that are played by 'number_of_processes' processes
+
+			The processes update Q1 and Q2 in shared memory without locks, see 'hogwild_train' in 'qtable.py'.
+		'''
+
+		if render:
+			print('Start parallel training of', self.name, ' with the following parameters:')
+			print('Number of games:', number_of_games, ' | number of processes:', number_of_processes, ' | alpha:', self.alpha, ' | epsilon:', self.epsilon, ' | gamma:', self.gamma)
+			print()
+			print(0, 'games completed')
+		hogwild_train(self, ['Q1', 'Q2'], game, number_of_games, number_of_processes, render)
+		if render:
+			print()
+
 
 class TDPlayer:
 	def __init__(self, alpha, epsilon, gamma, lanbda):
@@ -393,8 +441,26 @@ class TDPlayer:
 		if render:
 			print()
 
+	def train_parallel(self, game, number_of_games, number_of_processes, render):
+		'''Trains the player on 'number_of_games' games that are played by 'number_of_processes' processes
+
+			The processes update V in shared memory without locks, see 'hogwild_train' in 'qtable.py'.
+		'''
+
+		if render:
+			print('Start parallel training of', self.name, ' with the following parameters:')
+			print('Number of games:', number_of_games, ' | number of processes:', number_of_processes, ' | alpha:', self.alpha, ' | epsilon:', self.epsilon, ' | gamma:', self.gamma)
+			print()
+			print(0, 'games completed')
+		hogwild_train(self, ['V'], game, number_of_games, number_of_processes, render)
+		if render:
+			print()
+
 
 class DeepPlayer:
+	# Index permutations of the encoded state, see 'symmetries(self)'
+	permutations = None
+
 	def __init__(self, alpha, epsilon, gamma, num_central_layers, central_layer_dim):
 		self.name = 'Deep'
 		self.alpha = alpha
@@ -421,6 +487,13 @@ class DeepPlayer:
 		else:
 			array += [0,1]
 		return torch.tensor(array, dtype=torch.float32)
+
+	def encode(self, game):
+		'''Returns the encoded state of 'game', it is copied from the game if the game tracks its features'''
+
+		if getattr(game, 'features', None) is not None:
+			return torch.frombuffer(game.features, dtype=torch.float32).clone()
+		return self.preprocess(game.board, game.player)
 	
 	@torch.no_grad()
 	def choice(self, game):
@@ -432,7 +505,7 @@ class DeepPlayer:
 				max_action = None
 				for action in game.legal_actions():
 					game.execute(action)
-					x = self.preprocess(game.board, game.player)
+					x = self.encode(game)
 					V = self.net(x).item()
 					if V > max_V:
 						max_V = V
@@ -444,7 +517,7 @@ class DeepPlayer:
 				min_action = None
 				for action in game.legal_actions():
 					game.execute(action)
-					x = self.preprocess(game.board,game.player)
+					x = self.encode(game)
 					V = self.net(x).item()
 					if V < min_V:
 						min_V = V
@@ -452,10 +525,52 @@ class DeepPlayer:
 					game.undo(action)
 				return min_action
 
-	def update(self, board, player, T, t, reward):
+	def symmetries(self):
+		'''Returns the index permutations of the encoded state that belong to the symmetries of the board
+
+			A Tic Tac Toe board has eight symmetries: four rotations, each with and without a reflection.
+			The encoded state x of a symmetric board is x[permutation].
+		'''
+
+		if self.permutations is None:
+			coordinates = []
+			for i in range(3):
+				for j in range(3):
+					coordinates.append((i, j))
+			transformations = []
+			for rotations in range(4):
+				for reflect in [False, True]:
+					transformation = []
+					for i, j in coordinates:
+						for r in range(rotations):
+							i, j = j, 2 - i
+						if reflect:
+							j = 2 - j
+						transformation.append(i*3 + j)
+					transformations.append(transformation)
+			permutations = []
+			for transformation in transformations:
+				permutation = []
+				for position in transformation:
+					permutation += [position*3 + k for k in range(3)]
+				permutations.append(permutation + [9*3, 9*3 + 1])
+			self.permutations = torch.tensor(permutations)
+		return self.permutations
+
+	def symmetric_variants(self, x, target):
+		'''Expands a batch of encoded states and their targets by the symmetric variants of the states'''
+
+		permutations = self.symmetries()
+		x = x[:, permutations].reshape(-1, x.shape[-1])
+		target = target.repeat_interleave(len(permutations), dim=0)
+		return x, target
+
+	def update(self, board, player, T, t, reward, augment=False):
 		target = torch.tensor([0.5*(self.gamma**(T-t))*reward + 0.5], dtype=torch.float32)
 		
 		x = self.preprocess(board, player)
+		if augment:
+			x, target = self.symmetric_variants(x.view(1, -1), target.view(1, 1))
 
 		self.optimizer.zero_grad()
 		loss = self.loss_fn(target, self.net(x))
@@ -464,7 +579,15 @@ class DeepPlayer:
 		
 		return loss
 
-	def train_single_game(self, game):
+	def update_batch(self, x, target):
+		self.optimizer.zero_grad()
+		loss = self.loss_fn(target, self.net(x))
+		loss.backward()
+		self.optimizer.step()
+
+		return loss
+
+	def train_single_game(self, game, augment=False):
 		losslist = []
 
 		game.reset()
@@ -487,12 +610,17 @@ class DeepPlayer:
 			reward = 0
 
 		for board, player, t in episode:
-			loss = self.update(board, player, T, t, reward)
+			loss = self.update(board, player, T, t, reward, augment)
 			losslist.append(loss.item())
 		
 		return losslist
 
-	def train(self, game, number_of_games, decrease_parameters, render):
+	def train(self, game, number_of_games, decrease_parameters, render, augment=False):
+		'''Trains the player on 'number_of_games' games against itself
+
+			If 'augment' is True, every state is learned together with its symmetric variants.
+		'''
+
 		decrease_alpha = decrease_parameters['decrease_alpha']
 		alpha_decrease_factor = decrease_parameters['alpha_decrease_factor']
 		decrease_epsilon = decrease_parameters['decrease_epsilon']
@@ -507,10 +635,11 @@ class DeepPlayer:
 			print('Number of games:', number_of_games)
 			print('Alpha:', self.alpha, ' | decrease alpha:', decrease_alpha, ' | alpha decrease factor', alpha_decrease_factor)
 			print('Epsilon:', self.epsilon, ' | decrease epsilon:', decrease_epsilon, ' | epsilon decrease factor', epsilon_decrease_factor)
+			print('Augment:', augment)
 			print()
 			print(0, 'games completed')
 		for i in range(1, number_of_games + 1):
-			loss = self.train_single_game(game)
+			loss = self.train_single_game(game, augment)
 			losslist.append(mean(loss))
 			if i % decrease_after == 0:
 				if decrease_alpha:
@@ -524,4 +653,26 @@ class DeepPlayer:
 		if render:
 			print()
 
+		return losslist
+
+	def train_supervised(self, loader, number_of_epochs, render):
+		'''Trains the network on the minibatches of 'loader' for 'number_of_epochs' epochs
+
+			'loader' yields encoded states and their targets, for example the loader of a dataset
+			of labelled positions (see 'dataset_loader' in 'dataset.py').
+		'''
+
+		losslist = []
+		if render:
+			print('Start supervised training of', self.name, 'for', number_of_epochs, 'epochs')
+		for epoch in range(1, number_of_epochs + 1):
+			epoch_loss = []
+			for x, target in loader:
+				epoch_loss.append(self.update_batch(x, target).item())
+			losslist += epoch_loss
+			if render:
+				print('Epoch', epoch, 'completed.', 'Mean loss:', round(mean(epoch_loss), 5))
+		if render:
+			print()
+
 		return losslist
\ No newline at end of file
@@ -0,0 +1,333 @@
+'''Dense Q table
+
+This file contains the dense tables that are used in the batched training of the class 'QPlayer'. Comments:
+
+	A board is identified with its index in {0,...,3**9-1}: the position i contributes 3**i times
+	0 for an empty position, 1 for player x and 2 for player o.
+	The tables Q1 (player x) and Q2 (player o) are stored in one array of shape (2, 3**9, 9),
+	so a value is read and written by an index instead of a dictionary lookup.
+	Like the dictionaries of the 'QPlayer', entries that were never visited hold a small random value.
+
+The most important function is 'train_batch(...)':
+
+	It plays 'number_of_envs' games at once as rows of a NumPy array, with the same updates as
+	'train_single_game' of the 'QPlayer'. When several games update the same entry in the same
+	step, the entry is moved by the mean of their errors.
+
+The class 'SharedTable' is a dense table in shared memory that can be used in place of the dictionaries
+of the 'QPlayer' and the 'TDPlayer'. With 'hogwild_train(...)' several processes play games with
+'train_single_game' and update the same shared tables without locks (Hogwild).
+
+A table can be saved as a plain NumPy array with 'save_table(...)', entries that were never visited are NaN.
+
+For playing, a table can be exported with 'export_table(...)' as two sorted flat arrays of the indices
+of its keys and of its values. The class 'MappedTable' opens the arrays read-only with mmap and looks
+values up by binary search, so nothing has to be unpickled and processes share the pages of the files.
+It can also open an array of 'save_table(...)', then values are looked up by direct index.
+'''
+
+
+import random
+import time
+import multiprocessing
+import numpy as np
+
+from multiprocessing import shared_memory
+
+
+POWERS = 3**np.arange(9)
+LINES = np.array([[0,1,2], [3,4,5], [6,7,8], [0,3,6], [1,4,7], [2,5,8], [0,4,8], [6,4,2]])
+
+
+def state_index(state):
+	'''Returns the index of a board given as a tuple'''
+
+	index = 0
+	for i in range(8, -1, -1):
+		index = 3*index + state[i] % 3
+	return index
+
+
+def state_indices(boards):
+	'''Returns the indices of the rows of the array 'boards' '''
+
+	return (boards.astype(np.int64) % 3) @ POWERS
+
+
+def state_of_index(index):
+	'''Returns the board with index 'index' as a tuple'''
+
+	state = []
+	for i in range(9):
+		digit = index % 3
+		state.append(-1 if digit == 2 else digit)
+		index //= 3
+	return tuple(state)
+
+
+class DenseQTable:
+	def __init__(self, rng):
+		self.rng = rng
+		self.Q = (rng.random((2, 3**9, 9), dtype=np.float32)*2 - 1)*0.2
+		self.visited = np.zeros((2, 3**9, 9), dtype=bool)
+
+	def load(self, Q1, Q2):
+		'''Copies the entries of the dictionaries Q1 and Q2 of a 'QPlayer' into the table'''
+
+		for p, Q in enumerate([Q1, Q2]):
+			for (state, action), value in Q.items():
+				index = state_index(state)
+				self.Q[p, index, action] = value
+				self.visited[p, index, action] = True
+
+	def store(self, Q1, Q2):
+		'''Writes all visited entries of the table into the dictionaries Q1 and Q2 of a 'QPlayer' '''
+
+		for p, Q in enumerate([Q1, Q2]):
+			for index, action in np.argwhere(self.visited[p]):
+				Q[(state_of_index(index.item()), action.item())] = self.Q[p, index, action].item()
+
+	def update(self, p, states, actions, targets, alpha):
+		'''Moves the entries (states, actions) of table p towards the targets'''
+
+		Q = self.Q[p].reshape(-1)
+		keys = states*9 + actions
+		unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+		errors = np.bincount(inverse, weights=targets - Q[keys], minlength=len(unique_keys))
+		Q[unique_keys] += alpha*errors/counts
+		self.visited[p].reshape(-1)[unique_keys] = True
+
+	def train_batch(self, number_of_envs, alpha, epsilon, gamma):
+		'''Plays 'number_of_envs' games at once and updates the table'''
+
+		boards = np.zeros((number_of_envs, 9), dtype=np.int8)
+		envs = np.arange(number_of_envs)
+		previous_states = np.zeros((2, number_of_envs), dtype=np.int64)
+		previous_actions = np.zeros((2, number_of_envs), dtype=np.int64)
+
+		for t in range(9):
+			# Player x (p = 0) maximizes Q1 and player o (p = 1) minimizes Q2
+			p = t % 2
+			sign = 1 - 2*p
+			states = state_indices(boards[envs])
+			legal = boards[envs] == 0
+			values = np.where(legal, self.Q[p, states], -sign*np.inf)
+			best_actions = values.argmax(1) if p == 0 else values.argmin(1)
+
+			if t >= 2:
+				best = values[np.arange(len(envs)), best_actions]
+				self.update(p, previous_states[p, envs], previous_actions[p, envs], gamma*best, alpha)
+
+			random_actions = np.where(legal, self.rng.random(legal.shape), -1).argmax(1)
+			actions = np.where(self.rng.random(len(envs)) < epsilon, random_actions, best_actions)
+			previous_states[p, envs] = states
+			previous_actions[p, envs] = actions
+
+			boards[envs, actions] = sign
+			won = (boards[envs][:, LINES].sum(2) == 3*sign).any(1)
+			terminated = won | (t == 8)
+
+			ended = envs[terminated]
+			if len(ended) > 0:
+				rewards = np.where(won[terminated], sign, 0)
+				self.update(p, previous_states[p, ended], previous_actions[p, ended], rewards, alpha)
+				self.update(1-p, previous_states[1-p, ended], previous_actions[1-p, ended], rewards, alpha)
+
+			envs = envs[~terminated]
+			if len(envs) == 0:
+				break
+
+
+class SharedTable:
+	'''Dictionary-like view of a dense table in shared memory
+
+		If 'with_actions' is True the keys are pairs (state, action) as in Q1 and Q2 of the 'QPlayer',
+		otherwise the keys are states as in V of the 'TDPlayer'. Entries are read and written without locks.
+		The entries are accessed through memoryviews and the indices of the keys are memoized, so an access
+		costs about as much as a dictionary lookup.
+	'''
+
+	def __init__(self, with_actions):
+		self.with_actions = with_actions
+		size = 3**9*9 if with_actions else 3**9
+		self.memory = shared_memory.SharedMemory(create=True, size=size*5)
+		self.array = np.ndarray(size, dtype=np.float32, buffer=self.memory.buf)
+		self.array[:] = (np.random.random(size)*2 - 1)*0.2
+		self.values = self.memory.buf[:size*4].cast('f')
+		self.visited = self.memory.buf[size*4:]
+		self.visited[:] = bytes(size)
+		self.indices = {}
+
+	def __len__(self):
+		return sum(self.visited)
+
+	def index(self, key):
+		index = self.indices.get(key)
+		if index is None:
+			if self.with_actions:
+				index = state_index(key[0])*9 + key[1]
+			else:
+				index = state_index(key)
+			self.indices[key] = index
+		return index
+
+	def get(self, key, default=None):
+		index = self.index(key)
+		self.visited[index] = 1
+		return self.values[index]
+
+	__getitem__ = get
+
+	def __setitem__(self, key, value):
+		index = self.index(key)
+		self.values[index] = value
+		self.visited[index] = 1
+
+	def load(self, table):
+		'''Copies the entries of a dictionary into the table'''
+
+		for key, value in table.items():
+			self[key] = value
+
+	def store(self, table):
+		'''Writes all visited entries of the table into a dictionary'''
+
+		visited = np.frombuffer(self.visited, dtype=np.uint8)
+		for index in np.flatnonzero(visited).tolist():
+			if self.with_actions:
+				table[(state_of_index(index//9), index % 9)] = self.values[index]
+			else:
+				table[state_of_index(index)] = self.values[index]
+		del visited
+
+	def close(self):
+		self.values.release()
+		self.visited.release()
+		del self.array, self.values, self.visited
+		self.memory.close()
+		self.memory.unlink()
+
+
+def save_table(file_path, table, with_actions):
+	'''Saves a dictionary of the 'QPlayer' or the 'TDPlayer' as a dense NumPy array, unvisited entries are NaN'''
+
+	values = np.full(3**9*9 if with_actions else 3**9, np.nan, dtype=np.float32)
+	for key, value in table.items():
+		values[state_index(key[0])*9 + key[1] if with_actions else state_index(key)] = value
+	np.save(file_path, values)
+
+
+def load_table(file_path, with_actions):
+	'''Returns the dictionary of a table saved with 'save_table' '''
+
+	values = np.load(file_path)
+	table = {}
+	for index in np.flatnonzero(~np.isnan(values)).tolist():
+		key = (state_of_index(index//9), index % 9) if with_actions else state_of_index(index)
+		table[key] = values[index].item()
+	return table
+
+
+def hogwild_worker(player, names, tables, game, number_of_games, counter, k):
+	random.seed()
+	for name, table in zip(names, tables):
+		setattr(player, name, table)
+	for i in range(number_of_games):
+		player.train_single_game(game)
+		counter[k] += 1
+
+
+def hogwild_train(player, names, game, number_of_games, number_of_processes, render):
+	'''Trains 'player' with 'number_of_processes' processes that share the tables of 'player'
+
+		'names' are the names of the dictionaries of the player, for example ['Q1', 'Q2'].
+		The processes are forked, so this requires a Unix system.
+	'''
+
+	tables = []
+	for name in names:
+		table = SharedTable(name != 'V')
+		table.load(getattr(player, name))
+		tables.append(table)
+
+	context = multiprocessing.get_context('fork')
+	counter = context.Array('i', number_of_processes, lock=False)
+	processes = []
+	for k in range(number_of_processes):
+		n = number_of_games//number_of_processes + (1 if k < number_of_games % number_of_processes else 0)
+		process = context.Process(target=hogwild_worker, args=(player, names, tables, game, n, counter, k))
+		process.start()
+		processes.append(process)
+
+	milestone = 1
+	while any(process.is_alive() for process in processes):
+		time.sleep(0.1)
+		while render and milestone <= 10 and sum(counter) >= milestone*number_of_games/10:
+			print(int(milestone*number_of_games/10), 'games completed')
+			milestone += 1
+	for process in processes:
+		process.join()
+	while render and milestone <= 10:
+		print(int(milestone*number_of_games/10), 'games completed')
+		milestone += 1
+
+	for name, table in zip(names, tables):
+		table.store(getattr(player, name))
+		table.close()
+
+
+def export_table(dir_path, name, table, with_actions):
+	'''Writes a dictionary of the 'QPlayer' or the 'TDPlayer' as the sorted arrays 'name_keys.npy' and 'name_values.npy' '''
+
+	keys = np.array([state_index(key[0])*9 + key[1] if with_actions else state_index(key) for key in table], dtype=np.int64)
+	values = np.array(list(table.values()), dtype=np.float32)
+	order = np.argsort(keys)
+	np.save(dir_path + '/' + name + '_keys.npy', keys[order])
+	np.save(dir_path + '/' + name + '_values.npy', values[order])
+
+
+class MappedTable:
+	'''Read-only dictionary-like view of a table in memory-mapped files
+
+		'values_path' is an array of 'export_table' together with its array of keys 'keys_path',
+		or a dense array of 'save_table' if 'keys_path' is None. Entries that the player writes, like
+		the random values of unvisited entries, are kept in the dictionary 'overlay' and not in the files.
+	'''
+
+	def __init__(self, values_path, with_actions, keys_path=None):
+		self.with_actions = with_actions
+		self.values = np.load(values_path, mmap_mode='r')
+		self.keys = None if keys_path is None else np.load(keys_path, mmap_mode='r')
+		self.overlay = {}
+
+	def __len__(self):
+		if self.keys is None:
+			return int((~np.isnan(self.values)).sum()) + len(self.overlay)
+		return len(self.keys) + len(self.overlay)
+
+	def index(self, key):
+		if self.with_actions:
+			return state_index(key[0])*9 + key[1]
+		return state_index(key)
+
+	def get(self, key, default=None):
+		value = self.overlay.get(key)
+		if value is not None:
+			return value
+		index = self.index(key)
+		if self.keys is None:
+			value = self.values[index].item()
+			return default if value != value else value
+		k = np.searchsorted(self.keys, index)
+		if k < len(self.keys) and self.keys[k] == index:
+			return self.values[k].item()
+		return default
+
+	def __getitem__(self, key):
+		value = self.get(key)
+		if value is None:
+			raise KeyError(key)
+		return value
+
+	def __setitem__(self, key, value):
+		self.overlay[key] = value
@@ -11,9 +11,19 @@ import os
 import matplotlib.pyplot as plt
 
 from statistics import mean
+from time import perf_counter
 
+from players import QPlayer, TDPlayer
+from qtable import export_table, MappedTable
+
+
+def play(game, player_x, player_o, first_action_random, render, latencies=None):
+	'''Plays one game between player_x and player_o
+
+		If 'latencies' is a dictionary, the duration of every call of 'choice' is recorded in it,
+		see 'record_latency'. By default nothing is timed.
+	'''
 
-def play(game, player_x, player_o, first_action_random, render):
 	game.reset()
 	if render:
 		game.render()
@@ -23,27 +33,163 @@ def play(game, player_x, player_o, first_action_random, render):
 		if render:
 			game.render()
 	while not game.terminated:
-		if game.player == 1:
-			action = player_x.choice(game)
+		player = player_x if game.player == 1 else player_o
+		if latencies is None:
+			action = player.choice(game)
 		else:
-			action = player_o.choice(game)
+			start = perf_counter()
+			action = player.choice(game)
+			record_latency(latencies, player.name, game.time, perf_counter() - start)
 		game.execute(action)
 		if render:
 			game.render()
 
 
-def evaluation(game, players, games_per_pair, first_action_random):
+def evaluation(game, players, games_per_pair, first_action_random, latencies=None):
 	scores = {}
 	for player_x in players:
 		for player_o in players:
 			score = {'x':0, 'o': 0, None: 0}
 			for i in range(games_per_pair):
-				play(game, player_x, player_o, first_action_random, False)
+				play(game, player_x, player_o, first_action_random, False, latencies)
 				score[game.winner] += 1
 			scores[(player_x.name, player_o.name)] = score
 	return scores
 
 
+def record_latency(latencies, name, move_number, duration):
+	'''Stores the duration (in seconds) of a call of 'choice' in latencies[name][move_number]'''
+
+	per_move = latencies.get(name)
+	if per_move is None:
+		per_move = latencies[name] = {}
+	durations = per_move.get(move_number)
+	if durations is None:
+		durations = per_move[move_number] = []
+	durations.append(duration)
+
+
+def percentiles(durations):
+	'''Returns count, p50, p95, p99 and max of a list of durations (nearest-rank method)'''
+
+	durations = sorted(durations)
+	n = len(durations)
+	stats = {'count': n}
+	for name, q in [('p50', 50), ('p95', 95), ('p99', 99)]:
+		stats[name] = durations[max(0, -(-q*n//100) - 1)]
+	stats['max'] = durations[-1]
+	return stats
+
+
+def latency_report(latencies):
+	'''Aggregates recorded latencies per player, overall and per move number'''
+
+	report = {}
+	for name, per_move in latencies.items():
+		all_durations = []
+		for durations in per_move.values():
+			all_durations += durations
+		report[name] = {
+			'overall' : percentiles(all_durations),
+			'per_move' : {move_number: percentiles(per_move[move_number]) for move_number in sorted(per_move)}
+		}
+	return report
+
+
+def save_latency_report(file_path, latencies, budget=None):
+	'''Saves the latency report as a pickle file and as a readable text file next to it
+
+		If a budget (in seconds) is given, players whose p99 exceeds it are marked.
+	'''
+
+	report = latency_report(latencies)
+	with open(file_path, 'wb') as file:
+		pickle.dump(report, file)
+
+	lines = []
+	for name, stats in report.items():
+		overall = stats['overall']
+		line = name + ': ' + str(overall['count']) + ' moves'
+		for key in ['p50', 'p95', 'p99', 'max']:
+			line += ' | ' + key + ' ' + str(round(overall[key]*1000, 3)) + ' ms'
+		if budget is not None and overall['p99'] > budget:
+			line += ' | p99 exceeds budget of ' + str(round(budget*1000, 3)) + ' ms'
+		lines.append(line)
+		for move_number, move_stats in stats['per_move'].items():
+			line = '    move ' + str(move_number) + ': ' + str(move_stats['count']) + ' moves'
+			for key in ['p50', 'p95', 'p99', 'max']:
+				line += ' | ' + key + ' ' + str(round(move_stats[key]*1000, 3)) + ' ms'
+			lines.append(line)
+
+	i = file_path.find('.pickle')
+	with open(file_path[:i] + '.txt', 'w') as file:
+		file.write('\n'.join(lines) + '\n')
+
+	return report
+
+
+def export_tables(dir_path, qplayer, tdplayer):
+	'''Exports the tables of the Q Player and the TD Player into 'dir_path', see 'export_table' in 'qtable.py' '''
+
+	export_table(dir_path, 'qplayer_Q1', qplayer.Q1, True)
+	export_table(dir_path, 'qplayer_Q2', qplayer.Q2, True)
+	export_table(dir_path, 'tdplayer_V', tdplayer.V, False)
+
+
+def load_tabular_players(dir_path):
+	'''Returns the Q Player and the TD Player of a training directory
+
+		The players read their tables from memory-mapped files, from the sorted arrays if they were
+		exported and otherwise from the dense arrays. If neither exists, the pickled players are loaded.
+	'''
+
+	sorted_tables = os.path.isfile(dir_path + '/tdplayer_V_keys.npy')
+	if not sorted_tables and not os.path.isfile(dir_path + '/tdplayer_V.npy'):
+		with open(dir_path + '/qplayer.pickle', 'rb') as file:
+			qplayer = pickle.load(file)
+		with open(dir_path + '/tdplayer.pickle', 'rb') as file:
+			tdplayer = pickle.load(file)
+		return qplayer, tdplayer
+
+	tables = {}
+	for name, with_actions in [('qplayer_Q1', True), ('qplayer_Q2', True), ('tdplayer_V', False)]:
+		if sorted_tables:
+			tables[name] = MappedTable(dir_path + '/' + name + '_values.npy', with_actions, dir_path + '/' + name + '_keys.npy')
+		else:
+			tables[name] = MappedTable(dir_path + '/' + name + '.npy', with_actions)
+
+	with open(dir_path + '/training_info.pickle', 'rb') as file:
+		info = pickle.load(file)
+	qplayer = QPlayer(info['alpha_q'], info['epsilon_q'], info['gamma_q'])
+	qplayer.Q1 = tables['qplayer_Q1']
+	qplayer.Q2 = tables['qplayer_Q2']
+	tdplayer = TDPlayer(info['alpha_td'], info['epsilon_td'], info['gamma_td'], info['lanbda_td'])
+	tdplayer.V = tables['tdplayer_V']
+	return qplayer, tdplayer
+
+
+def compare_benchmarks(results, baseline, threshold):
+	'''Returns the relative changes of the metrics of a benchmark to a baseline and the names of the regressions
+
+		The name of a metric is 'kind/name'. Metrics whose kind ends with 'per_second' are better when they
+		are higher, all other metrics (latencies and memory sizes) are better when they are lower.
+		A metric is a regression if it is worse than in the baseline by more than the fraction 'threshold'.
+	'''
+
+	changes = {}
+	regressions = []
+	for name, value in results.items():
+		old_value = baseline.get(name)
+		if not old_value:
+			continue
+		change = (value - old_value)/old_value
+		changes[name] = change
+		worse = -change if name.split('/')[0].endswith('per_second') else change
+		if worse > threshold:
+			regressions.append(name)
+	return changes, regressions
+
+
 def visualize_scores(file_path):
 	with open(file_path, 'rb') as file:
 		scores = pickle.load(file)
@@ -5,8 +5,11 @@ Below you can specify the parameters for each player.
 
 In the end it will create a new directory './training_data/training_#' where '#' is
 a unique index to a training session. It will contain each player saved as a pickle file,
-a pickle file of a dictionary with all the information of the training and a
+the tables of the Q Player and the TD Player saved as NumPy arrays (dense or sorted, see 'qtable.py'), a pickle file of a dictionary with all the information of the training and a
 visualization of the loss of the DeepPlayer.
+
+	If you set 'use_dataset' in 'supervised_parameters' to True, the DeepPlayer is first trained
+	on a dataset of positions with their exact values before it plays against itself.
 '''
 
 
@@ -16,11 +19,14 @@ import time
 
 from game import TicTacToe
 from players import QPlayer, TDPlayer, DeepPlayer
-from tools import visualize_loss
+from tools import visualize_loss, export_tables
+from dataset import dataset_loader
+from qtable import save_table
 
 
-# Initialize game
+# Initialize games, the game of the Deep Player keeps the encoding of its position for the network up to date
 tictactoe = TicTacToe()
+tictactoe_deep = TicTacToe(track_features=True)
 
 
 # Initialize Q Player
@@ -50,10 +56,27 @@ deepplayer = DeepPlayer(alpha_deep, epsilon_deep, gamma_deep, num_central_layers
 # Training parameters
 render = True
 
+# If True, every state of the Deep Player is also learned in its rotated and reflected forms
+augment = False
+
 number_of_games_q = 200000
 number_of_games_td = 100000
 number_of_games_deep = 70000
 
+# With more than 1, the Q Player plays this many games at once on a dense Q table, e.g. 1000. This is faster
+# but not the same training: updates of the same entry in the same step are averaged, and only the updated
+# entries are written back into Q1 and Q2, the entries that were only read get new random values afterwards
+number_of_envs_q = 1
+
+# With more than one process, the games of the Q Player and the TD Player are played by that many processes
+# that share their tables. This requires a Unix system and takes precedence over 'number_of_envs_q'
+number_of_processes_q = 1
+number_of_processes_td = 1
+
+# The tables of the Q Player and the TD Player are saved as dense arrays. If True, they are exported as sorted
+# arrays of keys and values instead, which are smaller if only few entries were visited
+export_sorted_tables = False
+
 decrease_parameters = {
 	'decrease_alpha' : True,
 	'alpha_decrease_factor' : 0.8,
@@ -62,14 +85,35 @@ decrease_parameters = {
 	'decrease_after' : number_of_games_deep/10
 }
 
+# If 'use_dataset' is True, the player is first trained on the labelled positions of a dataset (see 'build_dataset.py')
+supervised_parameters = {
+	'use_dataset' : False,
+	'dir_path' : './dataset_data/dataset_1',
+	'number_of_epochs' : 1,
+	'batch_size' : 64,
+	'number_of_workers' : 0
+}
+
 
 # Training
 time1 = time.time()
-qplayer.train(tictactoe, number_of_games_q, render)
+if number_of_processes_q > 1:
+	qplayer.train_parallel(tictactoe, number_of_games_q, number_of_processes_q, render)
+elif number_of_envs_q > 1:
+	qplayer.train_batched(number_of_games_q, number_of_envs_q, render)
+else:
+	qplayer.train(tictactoe, number_of_games_q, render)
 time2 = time.time()
-tdplayer.train(tictactoe, number_of_games_td, render)
+if number_of_processes_td > 1:
+	tdplayer.train_parallel(tictactoe, number_of_games_td, number_of_processes_td, render)
+else:
+	tdplayer.train(tictactoe, number_of_games_td, render)
 time3 = time.time()
-loss = deepplayer.train(tictactoe, number_of_games_deep, decrease_parameters, render)
+supervised_loss = []
+if supervised_parameters['use_dataset']:
+	loader = dataset_loader(supervised_parameters['dir_path'], supervised_parameters['batch_size'], supervised_parameters['number_of_workers'])
+	supervised_loss = deepplayer.train_supervised(loader, supervised_parameters['number_of_epochs'], render)
+loss = deepplayer.train(tictactoe_deep, number_of_games_deep, decrease_parameters, render, augment)
 time4 = time.time()
 
 
@@ -116,6 +160,15 @@ with open(dir_path + '/deepplayer.pickle', 'wb') as file:
 	pickle.dump(deepplayer, file)
 
 
+# Save the tables of the Q Player and the TD Player as dense arrays or as sorted arrays of their visited entries
+if export_sorted_tables:
+	export_tables(dir_path, qplayer, tdplayer)
+else:
+	save_table(dir_path + '/qplayer_Q1.npy', qplayer.Q1, True)
+	save_table(dir_path + '/qplayer_Q2.npy', qplayer.Q2, True)
+	save_table(dir_path + '/tdplayer_V.npy', tdplayer.V, False)
+
+
 # Save loss in a pickle file
 with open(dir_path + '/loss_of_deepplayer.pickle', 'wb') as file:
 	pickle.dump(loss, file)
@@ -131,6 +184,9 @@ training_info = {
 	'epsilon_q' : epsilon_q,
 	'gamma_q' : gamma_q,
 	'number_of_games_q' : number_of_games_q,
+	'number_of_envs_q' : number_of_envs_q,
+	'export_sorted_tables' : export_sorted_tables,
+	'number_of_processes_q' : number_of_processes_q,
 	'training_time_q' : training_time_q,
 	'length_qtable' : length_qtable,
 
@@ -139,6 +195,7 @@ training_info = {
 	'gamma_td' : gamma_td,
 	'lanbda_td' : lanbda_td,
 	'number_of_games_td' : number_of_games_td,
+	'number_of_processes_td' : number_of_processes_td,
 	'training_time_td' : training_time_td,
 	'length_vtable' : length_vtable,
 
@@ -149,6 +206,9 @@ training_info = {
 	'central_layer_dim' : central_layer_dim,
 	'number_of_games_deep' : number_of_games_deep,
 	'decrease_parameters' : decrease_parameters,
+	'augment' : augment,
+	'supervised_parameters' : supervised_parameters,
+	'supervised_loss' : supervised_loss,
 	'training_time_deep' : training_time_deep,
 }
 